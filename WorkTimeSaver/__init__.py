@@ -1 +1,7 @@
 __version__ = '1.0.0'
+
+import os
+
+if os.environ.get('WORKTIMESAVER_INSTRUMENT'):
+    from WorkTimeSaver import instrumentation
+    instrumentation.configure(os.environ['WORKTIMESAVER_INSTRUMENT'])
@@ -9,6 +9,9 @@ this project were to provide:
     - salary before and after tax (with higher tax for overtime after set number of hours)
     - additional feature: salary exchanged to foreign currency
 
+Run without arguments to open GUI. With arguments command line interface is used (see cli module), then tkinter is not
+even imported.
+
 
 License:
 THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
@@ -20,15 +23,19 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
 
-from WorkTimeSaver.gui import Gui
-from sys import platform
+import sys
 
 
 def main():
-    """Sets GUI width according to used platform and runs it"""
+    """Runs command line interface when arguments are passed, otherwise sets GUI width according to used platform and
+    runs it (GUI module is imported only then)"""
 
-    width = '390' if platform == 'win32' else '450'
-    Gui('Work Time Saver', f'{width}x150').mainloop()
+    if len(sys.argv) > 1:
+        from WorkTimeSaver.cli import main as cli
+        return cli()
+    from WorkTimeSaver.gui import Gui
+    width = '390' if sys.platform == 'win32' else '450'
+    Gui('Work Time Saver', f'{width}x200').mainloop()
 
 
-if __name__ == '__main__': main()
+if __name__ == '__main__': sys.exit(main())
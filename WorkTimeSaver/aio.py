@@ -0,0 +1,145 @@
+"""Aio Module
+
+Asynchronous counterpart of Document for services based on asyncio (e.g. web service logging time of many employees).
+Work on year files is blocking (reading, writing, file locks and fsync), so it is done in bounded thread pool executor
+and event loop isn't blocked:
+
+    * operations on the same year file are serialized with asyncio lock of its path (in order of calls), so they wait
+      in event loop instead of occupying threads of executor blocked on file lock,
+    * operations on other year files (e.g. directories of other employees) run in parallel up to number of workers.
+
+File lock of storage is still held inside each operation, so other processes writing the same files are safe as well.
+
+    async def log(employee, dates):
+        storage = functools.partial(TextStorage, directory=employee)
+        return await AsyncDocument(*dates, storage=storage).process_file()
+
+Modules used are: `asyncio`, `concurrent`, `os`, `weakref`, `document` and `storage`. It is required to provide them
+before running application.
+
+License:
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import os
+import weakref
+from WorkTimeSaver.document import Document
+from WorkTimeSaver.storage import TextStorage
+
+WORKERS = 8
+
+executor = None
+locks = weakref.WeakKeyDictionary()
+
+
+def get_executor():
+    """Returns executor shared by module (thread pool with WORKERS threads created on first use)"""
+
+    global executor
+    if executor is None:
+        executor = ThreadPoolExecutor(WORKERS, thread_name_prefix='WorkTimeSaver')
+    return executor
+
+
+def get_lock(path):
+    """Returns asyncio lock of path for running event loop (locks of loop are dropped with it)"""
+
+    loop_locks = locks.setdefault(asyncio.get_running_loop(), {})
+    return loop_locks.setdefault(os.path.abspath(path), asyncio.Lock())
+
+
+class AsyncDocument:
+    """
+    A class processing document like Document does without blocking event loop.
+
+    ...
+
+    Attributes
+    ----------
+    document : document.Document
+        object doing the work in executor
+    path : str
+        path of document used as key of its lock
+    executor : concurrent.futures.Executor
+        executor running operations on document (None when executor of module is used)
+
+    Methods
+    -------
+    process_file()
+        adds record to document, returns salary before tax of month
+    load_month()
+        loads state of month to salary attribute of document, returns month number from last line
+    add_records(records, storage=TextStorage, executor=None)
+        adds many records to documents, documents of different years are processed in parallel
+    """
+
+    def __init__(self, date, end_time=None, storage=TextStorage, executor=None):
+        """
+        Parameters
+        ----------
+        date : datetime.datetime
+            datetime object with record date and hour - beginning of work
+        end_time : datetime.datetime, optional
+            datetime object with hour - end of work (omitted when document is only read)
+        storage : callable, optional
+            class of storage backend (see Document) (default is storage.TextStorage)
+        executor : concurrent.futures.Executor, optional
+            executor running blocking operations (default is None - thread pool of module with WORKERS threads)
+        """
+
+        self.document = Document(date, end_time, storage)
+        self.path = self.document.document
+        self.executor = executor
+
+    def __repr__(self):
+        return f'<AsyncDocument "{self.path}" with new record {self.document.record.__repr__()}>'
+
+    async def run(self, function, *args):
+        """Calls function with arguments in executor holding asyncio lock of document, returns its result"""
+
+        async with get_lock(self.path):
+            return await asyncio.get_running_loop().run_in_executor(self.executor or get_executor(), function, *args)
+
+    async def process_file(self):
+        """Adds record to document (see Document.process_file), returns salary before tax with its currency"""
+
+        return await self.run(self.document.process_file)
+
+    async def load_month(self):
+        """Loads state of month from document holding its lock (see Document.load_month), returns month number from
+        last line (None when document is empty), time of month is in document.salary"""
+
+        def load():
+            with self.document.storage.lock():
+                return self.document.load_month()
+
+        return await self.run(load)
+
+    @classmethod
+    async def add_records(cls, records, storage=TextStorage, executor=None):
+        """Adds many records at once (see Document.add_records), documents of different years are written in parallel
+
+        Parameters
+        ----------
+        records : iterable
+            two elements tuples with datetime objects representing beginning and end of work
+        storage : callable, optional
+            class of storage backend (see Document) (default is storage.TextStorage)
+        executor : concurrent.futures.Executor, optional
+            executor running blocking operations (default is None - thread pool of module)
+        """
+
+        years = {}
+        for dates in records:
+            years.setdefault(dates[0].year, []).append(dates)
+        documents = [cls(*group[0], storage=storage, executor=executor) for group in years.values()]
+        await asyncio.gather(*(document.run(Document.add_records, group, storage)
+                               for document, group in zip(documents, years.values())))
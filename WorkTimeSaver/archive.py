@@ -0,0 +1,234 @@
+"""Archive Module
+
+Compressed archive of closed years. Year file (e.g. "2019.txt") is compressed to gzip file next to it ("2019.txt.gz")
+where each month (lines up to and including separator of its summary) is separate gzip member, so archive is still
+valid gzip file which can be opened by any tool, e.g. `zcat 2019.txt.gz`. Small JSON index ("2019.txt.gz.idx") maps
+month to offsets and lengths of members with its records, therefore single month is read by decompressing only its
+member. Index keeps also size and modification time of year file from which archive was created.
+
+Readers (query, payroll, export and summary of month) use open_year, which chooses source transparently:
+
+    * year file when there is no archive or year file was changed after archiving (e.g. current year),
+    * archive (only requested months) when year file is the same as archived one or was removed after archiving,
+    * archive followed by year file when year file was removed after archiving and records were added to it later.
+
+Usage:
+
+    python -m WorkTimeSaver.archive PATH [PATH ...] [--before YEAR] [--remove]
+
+PATH is year file or directory searched for year files (see payroll). Only years before YEAR (default is current year)
+are archived, --remove deletes year files (and their checkpoints and lock files) after archiving.
+
+Modules used are: `argparse`, `datetime`, `gzip`, `io`, `json`, `os`, `sys`, `tempfile`, `parser`, `payroll` and
+`storage`. It is required to provide them before running application.
+
+License:
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import argparse
+from datetime import datetime
+import gzip
+from io import BytesIO
+import json
+import os
+import sys
+import tempfile
+from WorkTimeSaver.parser import RECORD, parse_line
+from WorkTimeSaver.storage import is_separator, locked
+
+ARCHIVE_EXTENSION = '.gz'
+INDEX_EXTENSION = '.idx'
+
+
+def get_signature(path):
+    """Returns tuple with size and modification time (ns) of year file, of its archive when year file doesn't exist or
+    None when there is neither of them"""
+
+    for name in (path, path + ARCHIVE_EXTENSION):
+        try:
+            stat = os.stat(name)
+        except FileNotFoundError:
+            continue
+        return stat.st_size, stat.st_mtime_ns
+    return None
+
+
+def load_index(path):
+    """Returns index of archive of year file (dictionary with size, mtime, removed and months) or None when archive
+    doesn't exist or is older than year file"""
+
+    try:
+        with open(path + ARCHIVE_EXTENSION + INDEX_EXTENSION, 'r') as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return None
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return index
+    if index['removed'] or (stat.st_size, stat.st_mtime_ns) == (index['size'], index['mtime']):
+        return index
+    return None
+
+
+def read_members(path, index, months=None):
+    """Returns decompressed bytes of members of archive with records of passed months (all months when None) in order
+    of archive"""
+
+    members = sorted({tuple(member) for month, values in index['months'].items()
+                      if months is None or int(month) in months for member in values})
+    parts = []
+    with open(path + ARCHIVE_EXTENSION, 'rb') as f:
+        for offset, length in members:
+            f.seek(offset)
+            parts.append(gzip.decompress(f.read(length)))
+    return b''.join(parts)
+
+
+def open_year(path, months=None):
+    """Opens year file or its archive for reading (see module documentation)
+
+    Parameters
+    ----------
+    path : str
+        path to year file (YYYY.txt), it doesn't have to exist when it was archived
+    months : iterable, optional
+        numbers of months which are needed, only their members of archive are decompressed (default is None - all
+        months), year file is always read whole, so lines of other months have to be skipped by caller
+
+    Returns
+    -------
+    io.BufferedReader or io.BytesIO
+        binary file with lines of year
+
+    Raises
+    ------
+    FileNotFoundError
+        when there is neither year file nor archive
+    """
+
+    index = load_index(path)
+    if index is None:
+        return open(path, 'rb')
+    data = read_members(path, index, None if months is None else set(months))
+    if index['removed'] and os.path.exists(path):
+        with open(path, 'rb') as f:
+            data += f.read()
+    return BytesIO(data)
+
+
+def archive(path, remove=False):
+    """Compresses year file to archive with one gzip member per month and writes its index
+
+    Archive and index replace previous ones atomically. Year file is read by open_year, so records added after year
+    file had been removed by previous archiving are included (year file is removed again then).
+
+    Parameters
+    ----------
+    path : str
+        path to year file
+    remove : bool, optional
+        True when year file, its checkpoint and lock file should be removed after archiving (default is False), lock
+        file is removed while it is held (see storage.locked)
+
+    Returns
+    -------
+    dict
+        index of archive
+    """
+
+    directory = os.path.dirname(os.path.abspath(path))
+    with locked(path + '.lock'):
+        previous = load_index(path)
+        remove = remove or bool(previous and previous['removed'])
+        with open_year(path) as source, tempfile.NamedTemporaryFile('wb', dir=directory, delete=False) as target:
+            months, block, block_months = {}, [], set()
+            for line in source:
+                block.append(line)
+                entry = parse_line(line)
+                if entry.kind == RECORD:
+                    block_months.add(entry.month)
+                if is_separator(line):
+                    write_member(target, block, block_months, months)
+                    block, block_months = [], set()
+            write_member(target, block, block_months, months)
+        stat = os.stat(path) if os.path.exists(path) else None
+        index = {'size': stat.st_size if stat else None, 'mtime': stat.st_mtime_ns if stat else None,
+                 'removed': remove or stat is None, 'months': dict(sorted(months.items()))}
+        with tempfile.NamedTemporaryFile('w', dir=directory, delete=False) as f:
+            json.dump(index, f)
+        os.replace(target.name, path + ARCHIVE_EXTENSION)
+        os.replace(f.name, path + ARCHIVE_EXTENSION + INDEX_EXTENSION)
+        if remove and stat:
+            for name in (path, path + '.idx', path + '.lock'):
+                if os.path.exists(name):
+                    os.remove(name)
+    return index
+
+
+def write_member(target, block, block_months, months):
+    """Writes lines of block as gzip member to target file and adds its offset and length to months of index"""
+
+    if not block:
+        return
+    offset = target.tell()
+    target.write(gzip.compress(b''.join(block), mtime=0))
+    for month in sorted(block_months) or [0]:
+        months.setdefault(str(month), []).append([offset, target.tell() - offset])
+
+
+def archive_closed(paths, before=None, remove=False):
+    """Archives year files of years before passed year (default is current year), returns list of archived paths
+
+    Year file is archived again when it was changed after archiving. When it was removed by previous archiving and
+    records were added later, they are moved to archive as well.
+
+    Parameters
+    ----------
+    paths : iterable
+        paths to year files or directories searched for them (see payroll.find_files)
+    before : int, optional
+        first year which isn't archived (default is current year)
+    remove : bool, optional
+        True when year files should be removed after archiving (default is False)
+    """
+
+    from WorkTimeSaver.payroll import YEAR_FILE, find_files
+
+    before = datetime.now().year if before is None else before
+    archived = []
+    for path in paths:
+        for file in find_files(path) if os.path.isdir(path) else [path]:
+            name = YEAR_FILE.fullmatch(os.path.basename(file))
+            if not name or int(name.group()[:4]) >= before or not os.path.exists(file):
+                continue
+            index = load_index(file)
+            if index is None or index['removed'] or remove:
+                archive(file, remove)
+                archived.append(file)
+    return archived
+
+
+def main(argv=None, prog=None):
+    """Parses command line arguments and archives closed years, returns exit code, prog is program name displayed in
+    usage"""
+
+    arguments = argparse.ArgumentParser(prog=prog, description='Compress year files of closed years.')
+    arguments.add_argument('paths', nargs='+', help='year files (YYYY.txt) or directories searched for them')
+    arguments.add_argument('--before', type=int, help='first year which is not archived (default is current)')
+    arguments.add_argument('--remove', action='store_true', help='remove year files after archiving')
+    options = arguments.parse_args(argv)
+    for path in archive_closed(options.paths, options.before, options.remove):
+        print(f'Archived {path} to {path + ARCHIVE_EXTENSION}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
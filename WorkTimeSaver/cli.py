@@ -0,0 +1,216 @@
+"""Command Line Interface
+
+Module allows to use application without graphical interface, e.g. from scripts, cron or on machines without display.
+It never imports tkinter so it starts quickly. Available commands:
+
+    worktimesaver add 26.02.20 8:00 16:30     - adds record (date, beginning and end of work) to year file
+    worktimesaver edit 26.02.20 8:00 16:00    - replaces hours of record of day and recalculates its month summary
+    worktimesaver delete 26.02.20             - removes record of day and recalculates its month summary
+    worktimesaver summary [--year 2020]       - displays summary of current month from year file
+    worktimesaver summary --month 3           - displays summary of passed month (only its records are read)
+    worktimesaver payroll DIRECTORY [...]     - calculates salaries from year files in directory tree (see payroll)
+    worktimesaver repair FILE [...]           - rebuilds month summaries of edited year files (see repair)
+    worktimesaver query 2019-03 2021-02       - sums work time and salary of months from year files (see query)
+    worktimesaver export DIRECTORY [...]      - exports records of year files to CSV or JSON Lines (see export)
+    worktimesaver daemon                      - keeps state of year files in memory for fast submits (see daemon)
+    worktimesaver archive DIRECTORY [...]     - compresses year files of closed years (see archive)
+
+Commands add and summary are sent to daemon when it is running in current directory.
+
+Modules used are: `argparse`, `datetime`, `sys`, `daemon` and `document`. It is required to provide them before running
+application.
+
+License:
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import argparse
+from datetime import datetime
+import sys
+from WorkTimeSaver.daemon import DaemonError, request
+from WorkTimeSaver.document import Document, parse_dates
+
+
+def create_parser():
+    """Returns argparse.ArgumentParser with all commands"""
+
+    parser = argparse.ArgumentParser(prog='worktimesaver', description='Save your work days to file.')
+    commands = parser.add_subparsers(dest='command', required=True)
+    command = commands.add_parser('add', help='add record to year file')
+    command.add_argument('date', help='date of work day in format dd.mm.yy, e.g. 26.02.20')
+    command.add_argument('start', help='beginning of work in format hh:mm, e.g. 8:00')
+    command.add_argument('end', help='end of work in format hh:mm, e.g. 16:30')
+    command.set_defaults(func=add)
+    command = commands.add_parser('edit', help='replace hours of record of day (see correction)')
+    command.add_argument('date', help='date of record in format dd.mm.yy, e.g. 26.02.20')
+    command.add_argument('start', help='new beginning of work in format hh:mm, e.g. 8:00')
+    command.add_argument('end', help='new end of work in format hh:mm, e.g. 16:30')
+    command.set_defaults(func=correct)
+    command = commands.add_parser('delete', help='remove record of day (see correction)')
+    command.add_argument('date', help='date of record in format dd.mm.yy, e.g. 26.02.20')
+    command.set_defaults(func=correct, start='0:00', end=None)
+    command = commands.add_parser('summary', help='display summary of current month')
+    command.add_argument('--year', type=int, default=datetime.now().year, help='year of file (default is current)')
+    command.add_argument('--month', type=int, choices=range(1, 13), metavar='MONTH',
+                         help='month number, summary of all its records instead of current month')
+    command.set_defaults(func=summary)
+    for name, text in (('payroll', 'calculate salaries from year files in directory tree'),
+                       ('repair', 'rebuild month summaries of edited year files'),
+                       ('query', 'sum work time and salary of months from year files'),
+                       ('export', 'export records of year files to CSV or JSON Lines'),
+                       ('daemon', 'keep state of year files in memory for fast submits'),
+                       ('archive', 'compress year files of closed years')):
+        commands.add_parser(name, help=text)
+    return parser
+
+
+def add(options, parser):
+    """Adds record from command line arguments to year file (by daemon when it is running) and prints salary of current
+    month"""
+
+    try:
+        dates = parse_dates(f'{options.date} {options.start}', options.end)
+    except ValueError:
+        parser.error('date and hour should be in correct format "dd.mm.yy", "hh:mm", e.g. 26.02.20 19:30')
+    try:
+        salary = request(f'ADD {options.date} {options.start} {options.end}')
+    except DaemonError as error:
+        print(f'Record was not saved: {error}', file=sys.stderr)
+        return 1
+    except OSError:
+        salary = Document(*dates).process_file()
+    print(f'Record added. In current month you have earned {salary} before tax.')
+    return 0
+
+
+def correct(options, parser):
+    """Replaces hours of record of day (edit command) or removes it (delete command, without end of work) and prints
+    salary of its month"""
+
+    from WorkTimeSaver.correction import delete_record, edit_record
+
+    deleted = options.end is None
+    try:
+        dates = parse_dates(f'{options.date} {options.start}', '0:00' if deleted else options.end)
+    except ValueError:
+        parser.error('date and hour should be in correct format "dd.mm.yy", "hh:mm", e.g. 26.02.20 19:30')
+    try:
+        salary = delete_record(dates[0]) if deleted else edit_record(*dates)
+    except ValueError as error:
+        print(f'Record was not changed: {error}', file=sys.stderr)
+        return 1
+    print(f'Record {"deleted" if deleted else "changed"}. In month {dates[0].month:02} you have '
+          f'earned {sum(salary.calculate_salary()):.2f}{salary.get_currency()} before tax.')
+    return 0
+
+
+def summary(options, _):
+    """Prints summary of month from last records of year file (from daemon when it is running) or of passed month"""
+
+    if options.month:
+        return month_summary(options.year, options.month)
+    document = Document(datetime(options.year, 1, 1))
+    try:
+        response = request(f'SUMMARY {options.year}')
+        month, text = response['month'], response['summary']
+    except DaemonError as error:
+        print(f'Summary is not available: {error}', file=sys.stderr)
+        return 1
+    except OSError:
+        with document.storage.lock():
+            month = document.load_month()
+        text = document.salary.sum_up()
+    if month is None:
+        print(f'There are no records in {document.document}.')
+        return 1
+    print(f'Month {month:02}:\n{text}', end='')
+    return 0
+
+
+def month_summary(year, month):
+    """Prints summary of all records of month from year file, only this month is decompressed when year is archived
+    (see archive)"""
+
+    from WorkTimeSaver.archive import open_year
+    from WorkTimeSaver.payroll import month_salaries
+
+    path = f'{year}.txt'
+    try:
+        with open_year(path, [month]) as f:
+            salary = month_salaries(f).get(month)
+    except FileNotFoundError:
+        salary = None
+    if not salary:
+        print(f'There are no records of month {month:02} in {path}.')
+        return 1
+    salary.period = year, month
+    print(f'Month {month:02}:\n{salary.sum_up()}', end='')
+    return 0
+
+
+def payroll(arguments):
+    """Runs payroll module with passed arguments"""
+
+    from WorkTimeSaver.payroll import main
+    return main(arguments, 'worktimesaver payroll')
+
+
+def repair(arguments):
+    """Runs repair module with passed arguments"""
+
+    from WorkTimeSaver.repair import main
+    return main(arguments, 'worktimesaver repair')
+
+
+def query(arguments):
+    """Runs query module with passed arguments"""
+
+    from WorkTimeSaver.query import main
+    return main(arguments, 'worktimesaver query')
+
+
+def export(arguments):
+    """Runs export module with passed arguments"""
+
+    from WorkTimeSaver.export import main
+    return main(arguments, 'worktimesaver export')
+
+
+def daemon(arguments):
+    """Runs daemon module with passed arguments"""
+
+    from WorkTimeSaver.daemon import main
+    return main(arguments, 'worktimesaver daemon')
+
+
+def archive(arguments):
+    """Runs archive module with passed arguments"""
+
+    from WorkTimeSaver.archive import main
+    return main(arguments, 'worktimesaver archive')
+
+
+def main(argv=None):
+    """Parses command line arguments and runs chosen command, returns exit code
+
+    Commands of other modules get all remaining arguments, they are parsed by these modules.
+    """
+
+    argv = sys.argv[1:] if argv is None else argv
+    modules = {'payroll': payroll, 'repair': repair, 'query': query, 'export': export,
+               'daemon': daemon, 'archive': archive}
+    if argv and argv[0] in modules:
+        return modules[argv[0]](argv[1:])
+    parser = create_parser()
+    options = parser.parse_args(argv)
+    return options.func(options, parser)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
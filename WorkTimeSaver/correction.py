@@ -0,0 +1,195 @@
+"""Correction Module
+
+Corrects or removes record of single day in year file without manual editing. Records are saved in chronological order,
+so record is found by binary search over bytes of file: middle of range is moved to beginning of the next record, which
+date is compared with searched one. Only records of the same month are read (from the beginning of its block found in
+table of blocks from checkpoint, see storage), summary of month is calculated again (see repair.copy_rebuilt) and file
+is rewritten from offset of corrected record to its end atomically (see storage.replace_tail). Head of file and other
+summaries are not read at all. Checkpoint is updated afterwards from its table of blocks: blocks before corrected month
+are kept, rewritten block is hashed again and offsets of later blocks are moved by change of length, so next submit
+doesn't parse file again. Whole file is parsed only when checkpoint doesn't exist.
+
+Modules used are: `datetime`, `io`, `os`, `document`, `parser`, `payroll`, `repair`, `salary` and `storage`. It is
+required to provide them before running application.
+
+License:
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+from bisect import bisect_right
+from datetime import datetime
+from io import BytesIO
+import os
+from WorkTimeSaver.document import Document, Record
+from WorkTimeSaver.parser import RECORD, parse_line
+from WorkTimeSaver.payroll import month_salaries
+from WorkTimeSaver.repair import copy_rebuilt
+from WorkTimeSaver.salary import Salary
+from WorkTimeSaver.storage import TextStorage, fold_lines, is_separator, replace_tail
+
+
+def next_record(file, offset):
+    """Returns tuple with offset and Entry of the first record (in exact format) which line begins at offset or after
+    it, (None, None) when there is no such record"""
+
+    file.seek(max(offset - 1, 0))
+    if offset:
+        file.readline()
+    position = file.tell()
+    for line in iter(file.readline, b''):
+        entry = parse_line(line)
+        if entry.kind == RECORD and entry.day is not None:
+            return position, entry
+        position += len(line)
+    return None, None
+
+
+def find_record(file, month, day):
+    """Returns offset of the first record of passed day or later (size of file when there is none) found by binary
+    search
+
+    Parameters
+    ----------
+    file : io.BufferedReader
+        year file opened in binary mode with records in chronological order
+    month : int
+        month number of searched record
+    day : int
+        day of searched record (0 finds the first record of month)
+    """
+
+    size = file.seek(0, os.SEEK_END)
+    low, high = 0, size
+    while low < high:
+        middle = (low + high) // 2
+        offset, entry = next_record(file, middle)
+        if entry is None or (entry.month, entry.day) >= (month, day):
+            high = middle
+        else:
+            low = offset + 1
+    offset, _ = next_record(file, low)
+    return size if offset is None else offset
+
+
+def edit_record(date, end_time):
+    """Replaces record of day with new hours of work and recalculates summary of its month
+
+    Parameters
+    ----------
+    date : datetime.datetime
+        date of corrected record with hour of beginning of work
+    end_time : datetime.datetime
+        hour of end of work
+
+    Returns
+    -------
+    salary.Salary
+        object with time of all records of month after correction
+
+    Raises
+    ------
+    ValueError
+        when there is no record of day in year file
+    """
+
+    return correct_record(date, str(Record(date, end_time)))
+
+
+def delete_record(date):
+    """Removes record of day (datetime.datetime) and recalculates summary of its month, returns Salary object with time
+    of remaining records of month, raises ValueError when there is no record of day in year file"""
+
+    return correct_record(date, None)
+
+
+def correct_record(date, line):
+    """Replaces record of day with line (removes it when line is None) holding lock of year file
+
+    Lines from the beginning of block of month to its separator are copied with summary recalculated (see
+    repair.copy_rebuilt) and replace file from offset of record to the end of block, the rest of file is moved after
+    them. Returns Salary object of month, raises ValueError when there is no record of day.
+    """
+
+    storage = TextStorage(date.year)
+    with storage.lock():
+        checkpoint = storage.load_checkpoint()
+        if storage.blocks is None:
+            checkpoint = False
+        try:
+            f = open(storage.document, 'rb')
+        except FileNotFoundError:
+            raise ValueError(f'There is no record of {date:%d.%m} in {storage.document}') from None
+        with f:
+            offset = find_record(f, date.month, date.day)
+            f.seek(offset)
+            old = f.readline()
+            entry = parse_line(old)
+            if entry.kind != RECORD or (entry.month, entry.day) != (date.month, date.day):
+                raise ValueError(f'There is no record of {date:%d.%m} in {storage.document}')
+            start = find_record(f, date.month, 0)
+            if checkpoint:
+                boundaries = [end for end, _ in storage.blocks]
+                index = bisect_right(boundaries, start)
+                start = boundaries[index - 1] if index else 0
+            f.seek(offset + len(old))
+            block = []
+            for next_line in iter(f.readline, b''):
+                block.append(next_line)
+                if is_separator(next_line):
+                    break
+            rest = f.read()
+            f.seek(start)
+            before = f.read(offset - start)
+        new = b'' if line is None else line.encode() + old[len(old.rstrip(b'\r\n')):]
+        segment = before + new + b''.join(block)
+        target = BytesIO()
+        copy_rebuilt(BytesIO(segment), target, date.year, storage.rates_file)
+        rebuilt = target.getvalue()
+        if not rebuilt.startswith(before):
+            offset, before = start, b''
+        replace_tail(storage.document, offset, rebuilt[len(before):] + rest)
+        if checkpoint and start + len(rebuilt) + len(rest):
+            update_checkpoint(storage, checkpoint, index, start, rebuilt, len(rebuilt) - len(segment))
+        else:
+            document = Document(datetime(date.year, 1, 1))
+            month = document.load_month()
+            if month is not None:
+                document.storage.save_checkpoint(month, document.salary)
+    salary = month_salaries(BytesIO(segment)).get(date.month, Salary())
+    salary.period = date.year, date.month
+    return salary
+
+
+def update_checkpoint(storage, checkpoint, index, start, rebuilt, shift):
+    """Saves checkpoint of corrected file without reading it again
+
+    Parameters
+    ----------
+    storage : storage.TextStorage
+        storage of year file with table of blocks loaded before correction
+    checkpoint : dict
+        state of month loaded before correction (see storage.TextStorage.load_checkpoint)
+    index : int
+        number of blocks before corrected one
+    start : int
+        offset of corrected block
+    rebuilt : bytes
+        new content of corrected block
+    shift : int
+        change of length of corrected block
+    """
+
+    blocks, _, state = fold_lines(BytesIO(rebuilt), start)
+    later = [[end + shift, digest] for end, digest in storage.blocks[index + len(blocks):]]
+    if blocks:
+        state = checkpoint['month'], checkpoint['worktime'], checkpoint['days']
+    storage.blocks = storage.blocks[:index] + blocks + later
+    salary = Salary(storage.rates_file)
+    salary.worktime, salary.days_at_work = state[1:]
+    storage.save_checkpoint(state[0], salary)
@@ -0,0 +1,221 @@
+"""Daemon Module
+
+Optional long-running process for setups where many records are submitted by scripts all day. It listens on Unix domain
+socket (by default ".worktimesaver.sock" in directory of year files) and keeps state of current month (Salary object)
+of each year file in memory, so submit doesn't start Python, read file or calculate month again. Records are written
+through to year files (with checkpoints) holding their locks, so files stay the same as without daemon. State of file is
+loaded again when its size or modification time was changed by someone else, e.g. manual edit.
+
+Protocol is one line of text per request and one line per response. Response is "OK" with JSON value or "ERROR" with
+message (month in summary is null when file is empty):
+
+    ADD 26.02.20 8:00 16:30     ->  OK "3000.00NOK"
+    SUMMARY 2020                ->  OK {"month": 2, "summary": "2\\t\\t\\t\\t12:00h\\n..."}
+    PING                        ->  OK "pong"
+
+CLI and GUI send requests to daemon when it is running in current directory, otherwise they process files themselves.
+
+Usage:
+
+    worktimesaver daemon [--socket PATH]
+
+Modules used are: `argparse`, `datetime`, `json`, `os`, `signal`, `socket`, `socketserver`, `sys`, `threading` and
+`document`. It is required to provide them before running application.
+
+License:
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import argparse
+from datetime import datetime
+import json
+import os
+import signal
+import socket
+import socketserver
+import sys
+import threading
+from WorkTimeSaver.document import Document, MonthCache, parse_dates
+
+SOCKET_FILE = '.worktimesaver.sock'
+
+
+class DaemonError(Exception):
+    """Error reported by daemon in response to request"""
+
+
+def request(command, path=SOCKET_FILE, timeout=10):
+    """Sends command to daemon and returns value from its response
+
+    Parameters
+    ----------
+    command : str
+        request line without line ending, e.g. 'ADD 26.02.20 8:00 16:30'
+    path : str, optional
+        path to socket of daemon (default is SOCKET_FILE)
+    timeout : float, optional
+        seconds of waiting for response (default is 10)
+
+    Returns
+    -------
+    object
+        value decoded from JSON in response
+
+    Raises
+    ------
+    OSError
+        when daemon isn't running (or Unix sockets aren't available), so request wasn't sent
+    DaemonError
+        when daemon couldn't process request or didn't respond (request could be processed)
+    """
+
+    if not hasattr(socket, 'AF_UNIX'):
+        raise OSError('Unix domain sockets are not available')
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.settimeout(timeout)
+        client.connect(path)
+        try:
+            client.sendall(command.encode() + b'\n')
+            with client.makefile('rb') as f:
+                response = f.readline().decode().rstrip('\n')
+        except OSError as error:
+            raise DaemonError(f'no response from daemon ({error})') from error
+    status, _, value = response.partition(' ')
+    if status != 'OK':
+        raise DaemonError(value or 'no response from daemon')
+    return json.loads(value)
+
+
+class Handler(socketserver.StreamRequestHandler):
+    """Handles connection with client answering each line of request"""
+
+    def handle(self):
+        for line in self.rfile:
+            self.wfile.write(self.server.respond(line.decode().strip()).encode() + b'\n')
+
+
+class Daemon(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """
+    A class of server keeping state of year files in memory and processing requests from clients.
+
+    ...
+
+    Attributes
+    ----------
+    cache : document.MonthCache
+        state of month of year files kept in memory
+    lock : threading.Lock
+        lock held while request changes or reads state of files
+
+    Methods
+    -------
+    respond(line)
+        returns response line for request line
+    add(dates)
+        adds record to year file, returns salary of month
+    summary(year)
+        returns month of last line and summary of current month from year file
+    """
+
+    daemon_threads = True
+
+    def __init__(self, path=SOCKET_FILE):
+        """
+        Parameters
+        ----------
+        path : str, optional
+            path of socket, socket file left by daemon which isn't running is removed (default is SOCKET_FILE)
+
+        Raises
+        ------
+        OSError
+            when other daemon is listening on the same socket
+        """
+
+        try:
+            request('PING', path)
+        except DaemonError:
+            pass
+        except OSError:
+            if os.path.exists(path):
+                os.remove(path)
+        else:
+            raise OSError(f'Daemon is already running on {path}')
+        self.cache = MonthCache()
+        self.lock = threading.Lock()
+        super().__init__(path, Handler)
+
+    def server_close(self):
+        super().server_close()
+        if os.path.exists(self.server_address):
+            os.remove(self.server_address)
+
+    def respond(self, line):
+        """Returns response line (without line ending) for request line"""
+
+        command, _, arguments = line.partition(' ')
+        try:
+            if command == 'ADD':
+                date, start, end = arguments.split()
+                value = self.add(parse_dates(f'{date} {start}', end))
+            elif command == 'SUMMARY':
+                month, text = self.summary(int(arguments))
+                value = {'month': month, 'summary': text}
+            elif command == 'PING':
+                value = 'pong'
+            else:
+                raise ValueError(f'Unknown command "{command}"')
+        except Exception as error:
+            return 'ERROR ' + ' '.join(str(error).split())
+        return 'OK ' + json.dumps(value)
+
+    def add(self, dates):
+        """Adds record to year file with state of month from memory and returns salary of month before tax
+
+        Parameters
+        ----------
+        dates : tuple
+            datetime objects with beginning and end of work
+        """
+
+        document = Document(*dates)
+        with self.lock, document.storage.lock():
+            salary = document.append_record(self.cache.load(document))
+            self.cache.store(document)
+        return salary
+
+    def summary(self, year):
+        """Returns tuple with month of last line of year file and summary of its month (None and '' when there are no
+        records)"""
+
+        document = Document(datetime(year, 1, 1))
+        with self.lock, document.storage.lock():
+            month = self.cache.load(document)
+        return month, document.salary.sum_up() if month is not None else ''
+
+
+def main(argv=None, prog=None):
+    """Parses command line arguments and runs daemon until it is interrupted or terminated (socket is removed then),
+    prog is program name displayed in usage"""
+
+    arguments = argparse.ArgumentParser(prog=prog, description='Keep state of year files in memory for fast submits.')
+    arguments.add_argument('--socket', default=SOCKET_FILE, help=f'path of socket (default is {SOCKET_FILE})')
+    options = arguments.parse_args(argv)
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    with Daemon(options.socket) as server:
+        print(f'Listening on {options.socket}')
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
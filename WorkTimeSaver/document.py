@@ -1,16 +1,25 @@
 """Document Module
 
-It includes methods mandatory to process text file and extend it with provided information about new record. Processing
-file starts with going through its lines backwards. Work time is collected from next records as long as they are in
-correct form or separator is met. Data are stored in Salary object. When month from last record is different than this
-passed in date then summarization is added to file.
+It includes methods mandatory to process document and extend it with provided information about new record. Document of
+each year is kept in storage backend (see storage module) - by default in text file, e.g. "2020.txt". Processing starts
+with taking state of month from checkpoint or going through document lines backwards (only its tail is read). Work time
+is collected from next records as long as they are in correct form or separator is met. Data are stored in Salary
+object. When month from last record is different than this passed in date then summarization is added to document.
+After each record state of month is saved to checkpoint.
 
-Modules used are: `datetime`, `re` and `salary`. It is required to provide them before running application.
+Modules used are: `contextlib`, `datetime`, `itertools`, `parser`, `salary` and `storage`. It is required to provide
+them before running application.
+
+It contains functions:
+
+    * parse_dates - converts strings with date and hours to datetime objects (faster than datetime.strptime).
+    * split_numbers - splits text by separator to list of numbers.
 
 It contains classes:
 
     * Record - formats string with new record according to set date.
-    * Document - process text file and extends it with new record or summarization.
+    * Document - process document and extends it with new record or summarization.
+    * MonthCache - keeps loaded state of month in memory (used by daemon and GUI) while file isn't changed.
 
 License:
 THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
@@ -22,9 +31,53 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
 
-from datetime import timedelta
-import re
+from contextlib import closing
+from datetime import datetime, timedelta
+from itertools import chain, groupby
+from WorkTimeSaver.parser import parse_line
 from WorkTimeSaver.salary import Salary
+from WorkTimeSaver.storage import TextStorage
+
+
+def parse_dates(start, end):
+    """Converts strings with date and hours to datetime objects
+
+    Works like datetime.strptime with formats '%d.%m.%y %H:%M' and '%H:%M' but without its overhead, which matters when
+    many records are converted at once. Repeated and surrounding whitespace is ignored.
+
+    Parameters
+    ----------
+    start : str
+        beginning of work - string with date and hour, e.g. '26.02.20 8:00'
+    end : str
+        end of work hour, e.g. '16:30'
+
+    Returns
+    -------
+    tuple
+        two elements tuple with datetime objects representing beginning and end of work
+
+    Raises
+    ------
+    ValueError
+        when passed strings are in incorrect format or contain wrong values
+    """
+
+    date, _, hour = ' '.join(start.split()).partition(' ')
+    day, month, year = split_numbers(date, '.', 3)
+    hour, minute = split_numbers(hour, ':', 2)
+    end_hour, end_minute = split_numbers(end.strip(), ':', 2)
+    year += 2000 if year < 69 else 1900
+    return datetime(year, month, day, hour, minute), datetime(1900, 1, 1, end_hour, end_minute)
+
+
+def split_numbers(text, separator, count):
+    """Splits text by separator to list with set count of numbers (one or two digits), raises ValueError otherwise"""
+
+    parts = text.split(separator)
+    if len(parts) != count or not all(0 < len(part) < 3 and part.isascii() and part.isdigit() for part in parts):
+        raise ValueError(f'Incorrect format of "{text}"')
+    return [int(part) for part in parts]
 
 
 class Record:
@@ -88,55 +141,125 @@ class Document:
     ----------
     document : str
         name (passed year in date and txt extension) of document where record will be stored
+    storage : storage.TextStorage or storage.SQLiteStorage
+        backend where records of year are read from and saved to
+    year : int
+        new record year
     month : int
         new record month number
     record : document.Record
-        object storing data about new record
+        object storing data about new record (None when end of work wasn't passed)
     salary : salary.Salary
         object responsible for salary calculation
 
     Methods
     -------
+    add_records(records)
+        adds many records (with summarization of months) to documents at once
     process_file()
         sum time from records in file, adds new record (and summarization when criteria are met), returns salary
+    append_record(month)
+        adds new record (and summarization when criteria are met) to file with loaded state of month, returns salary
+    load_month()
+        updates Salary object from checkpoint or last file records and returns month of last file line
     sum_month(lines)
         updates Salary object with minutes from passed records in list
-    get_info(pattern, line)
-        according to passed pattern search information in line and returns it
+    sum_record(record)
+        updates Salary object with minutes of appended record
     get_minutes(line)
         returns number of minutes at work stored in passed record
     get_month(line)
         returns month number from line
     get_lines()
-        collects lines from file and return them reversed
-    save_data(data)
-        appends file with data
+        returns generator of document lines in reverse order
+    save_data(*data)
+        appends document with data
     """
 
-    def __init__(self, date, end_time):
+    def __init__(self, date, end_time=None, storage=TextStorage):
         """
         Parameters
         ----------
         date : datetime.datetime
             datetime object with information about record date and hour - beginning of work
-        end_time : datetime.datetime
-            datetime object with hour - end of work
+        end_time : datetime.datetime, optional
+            datetime object with hour - end of work (omitted when document is only read, e.g. for summary of month)
+        storage : callable, optional
+            class of storage backend (or other callable returning it) called with year of record, e.g.
+            functools.partial(SQLiteStorage, database='work.db') (default is storage.TextStorage), exchange rates are
+            taken from its rates_file
         """
 
-        self.document = str(date.year) + '.txt'
+        self.storage = storage(date.year)
+        self.document = self.storage.document
+        self.year = date.year
         self.month = date.month
-        self.record = Record(date, end_time)
-        self.salary = Salary()
+        self.record = Record(date, end_time) if end_time else None
+        self.salary = Salary(self.storage.rates_file)
 
     def __repr__(self):
         return f'<Document "{self.document}" with new record {self.record.__repr__()}>'
 
+    @classmethod
+    def add_records(cls, records, storage=TextStorage):
+        """Adds many records to documents at once
+
+        Records are sorted and grouped by year. For each document (holding its lock) state of month is loaded once, then
+        records and summarization of months are collected in memory and appended to file with single write. Output is
+        the same as from calling process_file for each record in chronological order.
+
+        Parameters
+        ----------
+        records : iterable
+            two elements tuples with datetime objects representing beginning and end of work (see parse_dates)
+        storage : callable, optional
+            class of storage backend (see Document) (default is storage.TextStorage)
+        """
+
+        for _, group in groupby(sorted(records, key=lambda dates: dates[0]), key=lambda dates: dates[0].year):
+            document = cls(*next(group), storage=storage)
+            records = [document.record] + [Record(*dates) for dates in group]
+            with document.storage.lock():
+                data = []
+                month = document.load_month()
+                for record in records:
+                    record_month = int(record.date[3:])
+                    if month is not None and month != record_month:
+                        data.append(document.salary)
+                        document.salary = Salary(document.storage.rates_file)
+                    data.append(record)
+                    document.sum_record(record)
+                    document.salary.period = document.year, record_month
+                    month = record_month
+                document.save_data(*data)
+                document.storage.save_checkpoint(month, document.salary)
+
     def process_file(self):
         """Operates on file
 
-        Gets file lines or False when it doesn't exists. Then iterates through them backward summing time as long as
-        separator is met. When record from last file line is different than this stored in month attribute it saves
-        summarization and replaces Salary object with new one (blank). It appends file with new record.
+        Loads state of month from last file records (see load_month). When record from last file line is different than
+        this stored in month attribute it saves summarization and replaces Salary object with new one (blank). It
+        appends file with new record (and summarization in the same write) and stores checkpoint with updated state of
+        month. Whole sequence is done holding lock of storage, so concurrent processes don't interleave their writes.
+
+        Returns
+        -------
+        str
+            salary before tax with its currency from lines summed up
+        """
+
+        with self.storage.lock():
+            return self.append_record(self.load_month())
+
+    def append_record(self, month):
+        """Appends new record to file when state of month is already loaded to Salary object (see process_file)
+
+        It should be called holding lock of storage.
+
+        Parameters
+        ----------
+        month : int
+            month number from last file line (None when file is empty)
 
         Returns
         -------
@@ -144,24 +267,56 @@ class Document:
             salary before tax with its currency from lines summed up
         """
 
-        lines = self.get_lines()
-        if lines:
-            self.sum_month(lines)
-            month = self.get_month(list(self.get_lines())[0])
-            if month != self.month:
-                self.save_data(self.salary)
-                self.salary = Salary()
-        self.save_data(self.record)
-        self.sum_month([str(self.record)])
+        if month is not None and month != self.month:
+            self.save_data(self.salary, self.record)
+            self.salary = Salary(self.storage.rates_file)
+        else:
+            self.save_data(self.record)
+        self.salary.period = self.year, self.month
+        self.sum_record(self.record)
+        self.storage.save_checkpoint(self.month, self.salary)
         return f'{sum(self.salary.calculate_salary()):.2f}{self.salary.get_currency()}'
 
+    def load_month(self):
+        """Updates Salary object with time from records after last separator and returns month of last file line
+
+        State is taken from checkpoint (updated incrementally by storage when file was edited after it had been saved,
+        see storage.TextStorage.load_checkpoint). Without checkpoint file lines are iterated backward summing time as
+        long as separator is met (only this part of file is read). Year and month of last line become period of Salary
+        object (used for exchange rates).
+
+        Returns
+        -------
+        int
+            month number from last file line (0 when it wasn't found)
+        None
+            when file doesn't exist or is empty
+        """
+
+        checkpoint = self.storage.load_checkpoint()
+        if checkpoint:
+            self.salary.worktime = checkpoint['worktime']
+            self.salary.days_at_work = checkpoint['days']
+            month = checkpoint['month']
+        else:
+            lines = self.get_lines()
+            if not lines:
+                return None
+            with closing(lines):
+                last_line = next(lines, '')
+                self.sum_month(chain([last_line], lines))
+            month = self.get_month(last_line) if last_line else None
+        if month:
+            self.salary.period = self.year, month
+        return month
+
     def sum_month(self, lines):
         """Updates Salary object with time from list of file records as long as they contain proper values
 
         Parameters
         ----------
-        lines : list
-            a list with reversed records loaded from file
+        lines : iterable
+            reversed records loaded from file
         """
 
         for line in lines:
@@ -170,35 +325,27 @@ class Document:
                 break
             self.salary.update_work(time)
 
-    def get_info(self, pattern, line):
-        """Receives information from line according to set pattern
+    def sum_record(self, record):
+        """Updates Salary object with time of record appended to file, time of month is cleared when record has no time
+        (summing backward stops at it, see sum_month)
 
         Parameters
         ----------
-        pattern : str
-            structure of needed information
-        line : str
-            file line where information will be searched for
-
-        Returns
-        -------
-        str
-            information corresponding to pattern
-        False
-            when information wasn't found
+        record : document.Record
+            object with new record
         """
 
-        try:
-            return re.search(pattern, line).group(1)
-        except AttributeError:
-            return False
+        days = self.salary.days_at_work
+        self.sum_month([str(record)])
+        if self.salary.days_at_work == days:
+            self.salary.worktime = self.salary.days_at_work = 0
 
     def get_minutes(self, line):
         """Receives number of minutes from file line
 
         Parameters
         ----------
-        line : str
+        line : str or bytes
             file line where information about time will be searched for
 
         Returns
@@ -209,18 +356,15 @@ class Document:
             when time wasn't found in passed line
         """
 
-        result = self.get_info("\t(..:..)h", line)
-        if result:
-            time = result.split(":")
-            return int(time[0]) * 60 + int(time[1])
-        return False
+        minutes = parse_line(line).minutes
+        return False if minutes is None else minutes
 
     def get_month(self, line):
         """Receives number of month from file line
 
         Parameters
         ----------
-        line : str
+        line : str or bytes
             file line where information about month will be searched for
 
         Returns
@@ -231,36 +375,92 @@ class Document:
             when month wasn't found in passed line
         """
 
-        result = self.get_info(".(..)\t", line)
-        if result:
-            return int(result)
-        return 0
+        return parse_line(line).month
 
     def get_lines(self):
-        """Collects lines from file
+        """Returns lines of document from storage
 
         Returns
         -------
-        list
-            a list with reversed file lines
+        generator
+            document lines in reverse order read lazily from its end
         False
-            when file doesn't exists
+            when document doesn't exists
         """
 
-        try:
-            with open(self.document, 'r') as f:
-                return reversed(f.readlines())
-        except FileNotFoundError:
-            return False
+        return self.storage.get_lines()
 
-    def save_data(self, data):
-        """Appends file with new information
+    def save_data(self, *data):
+        """Appends document in storage with new information (each object in separate line) at once, data are synced to
+        disk according to durability mode of storage (see storage module)
 
         Parameters
         ----------
         data : object
-            object (Record or Salary) with __str__ method allowing to print information to file
+            objects (Record or Salary) with __str__ method allowing to print information to file
+        """
+
+        self.storage.save_data(*data)
+
+
+class MonthCache:
+    """
+    A class keeping loaded state of month of year files in memory between submits of long-running process.
+
+    It is used only with storages providing signature of file (get_signature method, e.g. storage.TextStorage), state
+    of other storages (e.g. storage.SQLiteStorage, which keeps it in indexed table) is always loaded from storage.
+
+    ...
+
+    Attributes
+    ----------
+    states : dict
+        year as key and tuple with signature of file (size and mtime), month of last line, Salary object and table of
+        blocks of file (see storage.TextStorage, None for other storages) as value
+
+    Methods
+    -------
+    load(document)
+        loads state of month to Document object from memory or from file, returns month of last line
+    store(document)
+        remembers state of month of Document object after new record was appended
+    """
+
+    def __init__(self):
+        self.states = {}
+
+    def __repr__(self):
+        return f'<MonthCache of {len(self.states)} year files>'
+
+    def load(self, document):
+        """Loads state of month to Document object and returns month of last line (see Document.load_month)
+
+        State kept in memory is used when file has the same size and modification time as when it was remembered,
+        otherwise it is loaded from file and remembered. Table of blocks is restored to storage as well, so checkpoint
+        saved after next record reads only the last block of file. State is not kept when storage doesn't provide
+        signature.
         """
 
-        with open(self.document, 'a+') as f:
-            print(data, file=f)
+        if not hasattr(document.storage, 'get_signature'):
+            return document.load_month()
+        signature = document.storage.get_signature()
+        state = self.states.get(document.year)
+        if state and state[0] == signature:
+            _, month, salary, blocks = state
+            document.salary.worktime, document.salary.days_at_work = salary.worktime, salary.days_at_work
+            document.salary.period = salary.period
+            if blocks is not None:
+                document.storage.blocks = list(blocks)
+            return month
+        month = document.load_month()
+        self.states[document.year] = signature, month, document.salary, getattr(document.storage, 'blocks', None)
+        return month
+
+    def store(self, document):
+        """Remembers state of month of Document object with current signature of its file, it should be called after
+        Document.append_record holding lock of storage (nothing is remembered when storage doesn't provide signature)"""
+
+        if not hasattr(document.storage, 'get_signature'):
+            return
+        self.states[document.year] = (document.storage.get_signature(), document.month, document.salary,
+                                      getattr(document.storage, 'blocks', None))
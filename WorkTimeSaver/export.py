@@ -0,0 +1,197 @@
+"""Export Module
+
+Exports year files to CSV or JSON Lines for payroll systems. Each record becomes one row (date, hours and minutes at
+work) and optionally each month gets summary row (days, minutes with deducted breaks, salary before and after tax)
+calculated from its records, like summaries written by Document. Files are streamed through generators line after line
+and rows are written in chunks of limited size, so memory usage doesn't depend on number or size of files.
+
+Usage:
+
+    python -m WorkTimeSaver.export PATH [PATH ...] [--format csv|json] [--summaries] [--output FILE]
+
+PATH is year file or directory searched for year files (see payroll).
+
+Modules used are: `argparse`, `csv`, `json`, `os`, `sys`, `archive`, `parser` and `payroll`. It is required to provide
+them before running application.
+
+License:
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+from WorkTimeSaver.archive import open_year
+from WorkTimeSaver.parser import RECORD, SUMMARY, parse_months
+from WorkTimeSaver.payroll import YEAR_FILE, find_files, sum_records
+
+FIELDS = ('file', 'year', 'kind', 'month', 'day', 'start', 'end', 'minutes', 'days', 'gross', 'net')
+BUFFER_SIZE = 64 * 1024
+
+
+class ChunkWriter:
+    """
+    A class collecting written text and passing it to output in chunks of set size.
+
+    ...
+
+    Attributes
+    ----------
+    output : io.TextIOBase
+        stream where chunks are written
+    size : int
+        number of characters collected before chunk is written
+    parts : list
+        text waiting for write
+    length : int
+        number of characters in parts
+
+    Methods
+    -------
+    write(text)
+        collects text, writes chunk when it reached set size
+    flush()
+        writes collected text to output
+    """
+
+    def __init__(self, output, size=BUFFER_SIZE):
+        self.output = output
+        self.size = size
+        self.parts = []
+        self.length = 0
+
+    def write(self, text):
+        """Collects text, writes collected chunk to output when it has at least set size"""
+
+        self.parts.append(text)
+        self.length += len(text)
+        if self.length >= self.size:
+            self.flush()
+
+    def flush(self):
+        """Writes collected text to output"""
+
+        self.output.write(''.join(self.parts))
+        self.parts.clear()
+        self.length = 0
+
+
+def format_minutes(minutes):
+    """Returns string with minutes formatted as hour (hh:mm) or None when minutes are None"""
+
+    return None if minutes is None else f'{minutes // 60:02}:{minutes % 60:02}'
+
+
+def summary_row(path, year, month, salary):
+    """Returns dictionary (keys from FIELDS) with summary of month from Salary object"""
+
+    money = salary.calculate_salary()
+    return dict.fromkeys(FIELDS) | {'file': path, 'year': year, 'kind': SUMMARY, 'month': month,
+                                    'minutes': salary.worktime, 'days': salary.days_at_work,
+                                    'gross': round(sum(money), 2), 'net': round(salary.deduct_tax(money), 2)}
+
+
+def file_rows(path, summaries=False):
+    """Yields rows of year file
+
+    Parameters
+    ----------
+    path : str
+        path to year file (it is read from archive when it was archived, see archive.open_year)
+    summaries : bool, optional
+        True when summary row should be yielded for records of each month, i.e. at each summary found in file and at
+        the end of file for current month, records are summed like in summaries written by Document (see
+        parser.fold_entry) (default is False)
+
+    Yields
+    ------
+    dict
+        row with keys from FIELDS, record row has date, hours and minutes at work, summary row has days, minutes with
+        deducted breaks and salary
+    """
+
+    name = YEAR_FILE.fullmatch(os.path.basename(path))
+    year = int(name.group()[:4]) if name else None
+    month, records = None, []
+    with open_year(path) as f:
+        for entry, month, records in parse_months(f):
+            if entry.kind == RECORD:
+                yield dict.fromkeys(FIELDS) | {'file': path, 'year': year, 'kind': RECORD, 'month': entry.month,
+                                               'day': entry.day, 'start': format_minutes(entry.start),
+                                               'end': format_minutes(entry.end), 'minutes': entry.minutes}
+            elif entry.kind == SUMMARY and summaries:
+                yield summary_row(path, year, month, sum_records(records))
+    if summaries and records:
+        yield summary_row(path, year, month, sum_records(records))
+
+
+def export(paths, output=sys.stdout, output_format='csv', summaries=False, buffer_size=BUFFER_SIZE):
+    """Streams rows of year files to output
+
+    Parameters
+    ----------
+    paths : iterable
+        paths to year files or directories searched for them
+    output : io.TextIOBase, optional
+        stream where rows are written (default is sys.stdout)
+    output_format : str, optional
+        'csv' or 'json' (JSON object in each line) (default is 'csv')
+    summaries : bool, optional
+        True when summary rows of months should be added (default is False)
+    buffer_size : int, optional
+        number of characters written to output at once (default is BUFFER_SIZE)
+
+    Returns
+    -------
+    int
+        number of written rows
+    """
+
+    writer = ChunkWriter(output, buffer_size)
+    if output_format == 'csv':
+        rows = csv.writer(writer)
+        rows.writerow(FIELDS)
+
+        def write(row):
+            rows.writerow(row.values())
+    else:
+        def write(row):
+            writer.write(json.dumps(row) + '\n')
+    count = 0
+    for path in paths:
+        for file in find_files(path) if os.path.isdir(path) else [path]:
+            for row in file_rows(file, summaries):
+                write(row)
+                count += 1
+    writer.flush()
+    return count
+
+
+def main(argv=None, prog=None):
+    """Parses command line arguments and exports year files, returns exit code, prog is program name displayed in
+    usage"""
+
+    arguments = argparse.ArgumentParser(prog=prog, description='Export records of year files to CSV or JSON Lines.')
+    arguments.add_argument('paths', nargs='+', help='year files (YYYY.txt) or directories searched for them')
+    arguments.add_argument('--format', choices=('csv', 'json'), default='csv', help='output format (default is csv)')
+    arguments.add_argument('--summaries', action='store_true', help='add summary row for each month')
+    arguments.add_argument('--output', help='file where rows are written (default is standard output)')
+    options = arguments.parse_args(argv)
+    if options.output:
+        with open(options.output, 'w', newline='') as output:
+            export(options.paths, output, options.format, options.summaries)
+    else:
+        export(options.paths, sys.stdout, options.format, options.summaries)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -3,10 +3,16 @@
 Module creates graphical user interface. It displays fields for data which are necessary to be collected. It also
 provides default values for typical day at work: current date with hours 8:00 - 16:30. It is responsible for integration
 document module with proper button, binding keys to methods (ENTER - save data to file, ESC - close application) and
-displaying message in case of error.
+displaying message in case of error. Submitted records are processed one after another by background thread, so window
+doesn't freeze while file is read. Results are passed back through queue checked periodically by main loop. When
+daemon is running in current directory records are sent to it (see daemon module). As soon as window appears worker
+thread loads state of month of current year file to cache (while user is still typing), so submit only appends record
+when file wasn't changed in the meantime. Window displays totals of month of entered date, loaded at start and updated
+from each saved record without reading file again (file of other year is loaded by worker thread too), and preview of
+totals with entered record refreshed shortly after typing stops (see totals module).
 
-Modules used are: `datetime`, `sys`, `tkinter`, `tkinter.messagebox` and `Document`. It is required to provide them
-before running application.
+Modules used are: `copy`, `datetime`, `queue`, `sys`, `threading`, `tkinter`, `tkinter.messagebox`, `daemon`,
+`Document` and `totals`. It is required to provide them before running application.
 
 License:
 THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
@@ -20,9 +26,16 @@ SOFTWARE.
 
 import tkinter as tk
 import tkinter.messagebox as msg
+import copy
 from datetime import datetime
-from WorkTimeSaver.document import Document
+from WorkTimeSaver.daemon import request
+from WorkTimeSaver.document import Document, MonthCache, parse_dates
+from WorkTimeSaver.totals import MonthTotals
+import queue
 import sys
+import threading
+
+PREVIEW_DELAY = 300
 
 
 class Gui(tk.Tk):
@@ -36,13 +49,49 @@ class Gui(tk.Tk):
     ----------
     variables : dict
         a dictionary storing variables from tkinter entry fields (needed to obtain data when submitted)
+    tasks : queue.Queue
+        dates of submitted records and of months to prefetch waiting for worker thread
+    results : queue.Queue
+        results of prefetch (totals of month) and of processed records (salary or exception) waiting for main loop
+    pending : int
+        number of submitted records and prefetches which results weren't displayed yet
+    cache : document.MonthCache
+        state of month of year files loaded by worker thread
+    submit_button : tkinter.Button
+        button disabled while any record is processed
+    totals : totals.MonthTotals
+        totals of month from last line of year file updated with saved records (None until they are loaded)
+    totals_text : tkinter.StringVar
+        displayed totals of month of entered date
+    preview_text : tkinter.StringVar
+        displayed totals of month with entered record
+    preview_job : str
+        identifier of scheduled preview update (None when it isn't scheduled)
+    closing : bool
+        True when application is closed, input stays disabled until pending records are saved
 
     Methods
     -------
     form_gui()
         uses class methods to shape GUI
     submit()
-        processes entered data
+        passes entered data to worker thread
+    work()
+        prefetches states of months and processes submitted records one by one (run in worker thread)
+    prefetch(date)
+        loads state of month of year file to cache and returns its totals
+    save(dates)
+        adds record to year file with state of month from cache
+    check_results()
+        displays results of prefetch and processed records, repeated by main loop as long as any of them is pending
+    show_totals(date)
+        displays totals of month of passed date
+    update_totals(dates)
+        updates totals of month with saved record
+    schedule_preview()
+        schedules update of preview after PREVIEW_DELAY milliseconds without changes of entries
+    update_preview()
+        displays totals of month with entered record
     get_data()
         loads data from entries and returns them in proper form
     convert_data(start, end)
@@ -56,7 +105,9 @@ class Gui(tk.Tk):
     bind_keys()
         binds ENTER key to submit method and ESC to close
     close()
-        shutdowns application
+        disables input and shutdowns application after submitted records are saved
+    close_when_saved()
+        shutdowns application when no result is pending, repeated by main loop until then
     """
 
     def __init__(self, title, size):
@@ -75,8 +126,20 @@ class Gui(tk.Tk):
         self.geometry(size)
         self.resizable(0, 0)
         self.variables = {}
+        self.tasks = queue.Queue()
+        self.results = queue.Queue()
+        self.pending = 1
+        self.cache = MonthCache()
+        self.preview_job = None
+        self.closing = False
+        self.totals = None
+        self.totals_text = tk.StringVar(self, value='Loading totals of month...')
+        self.preview_text = tk.StringVar(self)
         self.form_gui()
         self.bind_keys()
+        self.tasks.put(('totals', datetime.now()))
+        threading.Thread(target=self.work, daemon=True).start()
+        self.after(50, self.check_results)
 
     def form_gui(self):
         """Uses class methods to shape GUI"""
@@ -88,21 +151,145 @@ class Gui(tk.Tk):
         self.create_entry('start', 2, 1, '8:00')
         self.create_label('To:', 3, 0)
         self.create_entry('end', 3, 1, '16:30')
-        tk.Button(self, text='Submit', width=6, command=self.submit).grid(row=4, column=1, pady=15, sticky='E')
+        self.submit_button = tk.Button(self, text='Submit', width=6, command=self.submit)
+        self.submit_button.grid(row=4, column=1, pady=15, sticky='E')
         tk.Button(self, text='Exit', width=6, command=self.close).grid(row=4, column=2, pady=15, sticky='W')
+        tk.Label(self, textvariable=self.totals_text, font='none 10').grid(row=5, column=0, columnspan=3)
+        tk.Label(self, textvariable=self.preview_text, font='none 10').grid(row=6, column=0, columnspan=3)
+        self.update_preview()
 
     def submit(self, *_):
         """Submits entered data
 
-        Loads and processes data from entries then adds new record to file if they are correct. Proper message is
-        displayed and form cleared. *_ to ignore unused argument from ENTER key bind.
+        Loads data from entries and when they are correct passes them to worker thread which adds new record to file.
+        Form is cleared and Submit button disabled until result is displayed. Records submitted in the meantime wait in
+        queue. *_ to ignore unused argument from ENTER key bind.
         """
 
         dates = self.get_data()
         if dates:
-            salary = Document(*dates).process_file()
-            msg.showinfo('Success', f'Record added. In current month you have earned {salary} before tax. Keep going.')
+            self.tasks.put(('save', dates))
             self.clear_form()
+            self.submit_button.config(state='disabled')
+            self.pending += 1
+            if self.pending == 1:
+                self.after(50, self.check_results)
+
+    def work(self):
+        """Prefetches states of months of year files and processes submitted records (by daemon when it is running) one
+        after another in order of tasks, puts totals of month, salary or exception to results queue"""
+
+        while True:
+            kind, dates = self.tasks.get()
+            if kind == 'totals':
+                try:
+                    self.results.put(('totals', self.prefetch(dates), dates))
+                except Exception as error:
+                    self.results.put(('totals', error, dates))
+                self.tasks.task_done()
+                continue
+            start, end = dates
+            try:
+                try:
+                    salary = request(f'ADD {start:%d.%m.%y %H:%M} {end:%H:%M}')
+                except OSError:
+                    salary = self.save(dates)
+                self.results.put(('saved', salary, dates))
+            except Exception as error:
+                self.results.put(('error', error, dates))
+            self.tasks.task_done()
+
+    def prefetch(self, date):
+        """Loads state of month of year file (of passed datetime) to cache and returns totals.MonthTotals with its
+        copy"""
+
+        document = Document(date)
+        with document.storage.lock():
+            month = self.cache.load(document)
+        return MonthTotals(document.year, month, copy.copy(document.salary))
+
+    def save(self, dates):
+        """Adds record (tuple with datetime objects representing beginning and end of work) to year file like
+        Document.process_file, but state of month is taken from cache when file wasn't changed since it was loaded,
+        returns salary of month"""
+
+        document = Document(*dates)
+        with document.storage.lock():
+            salary = document.append_record(self.cache.load(document))
+            self.cache.store(document)
+        return salary
+
+    def check_results(self):
+        """Displays totals of month loaded by prefetch and messages with results of processed records
+
+        It is called by main loop (tkinter.Tk.after) again until there are no pending results, then Submit button is
+        enabled. Totals of month are updated with each saved record.
+        """
+
+        while True:
+            try:
+                kind, result, dates = self.results.get_nowait()
+            except queue.Empty:
+                break
+            self.pending -= 1
+            if kind == 'totals':
+                self.totals = result if isinstance(result, MonthTotals) else None
+                if self.totals:
+                    self.show_totals(dates)
+                else:
+                    self.totals_text.set(f'Totals are not available: {result}')
+                self.update_preview()
+            elif kind == 'saved':
+                self.update_totals(dates)
+                msg.showinfo('Success', f'Record added. In current month you have earned {result} before tax. '
+                                        f'Keep going.')
+            else:
+                msg.showerror('Error', f'Record was not saved: {result}')
+        if self.pending:
+            self.after(50, self.check_results)
+        elif not self.closing:
+            self.submit_button.config(state='normal')
+
+    def show_totals(self, date):
+        """Displays totals of month of passed datetime (empty when last line of file belongs to other month)"""
+
+        self.totals_text.set(str(self.totals.of_month(date)))
+
+    def update_totals(self, dates):
+        """Updates displayed totals with saved record (datetime objects with beginning and end of work), when record
+        was saved to file of other year its totals are loaded by worker thread (nothing happens when prefetch failed or
+        is pending)"""
+
+        if self.totals is None:
+            return
+        if self.totals.add(dates):
+            self.show_totals(dates[0])
+        else:
+            self.totals = None
+            self.totals_text.set('Loading totals of month...')
+            self.tasks.put(('totals', dates[0]))
+            self.pending += 1
+        self.update_preview()
+
+    def schedule_preview(self, *_):
+        """Schedules update of preview after PREVIEW_DELAY milliseconds, previously scheduled update is cancelled, so
+        preview is calculated once after typing stops, *_ to ignore unused arguments from variable trace"""
+
+        if self.preview_job is not None:
+            self.after_cancel(self.preview_job)
+        self.preview_job = self.after(PREVIEW_DELAY, self.update_preview)
+
+    def update_preview(self):
+        """Displays totals of month after adding entered record (calculated in memory), nothing when entered data are
+        incorrect or record belongs to other year"""
+
+        self.preview_job = None
+        date, start, end = (self.variables[name].get() for name in ('date', 'start', 'end'))
+        try:
+            totals = self.totals.preview(parse_dates(f'{date} {start}', end)) if self.totals else None
+        except ValueError:
+            totals = None
+        self.preview_text.set(f'With this record: {totals}' if totals else '')
 
     def get_data(self):
         """Gets data from entries and returns them in proper format
@@ -139,9 +326,7 @@ class Gui(tk.Tk):
         """
 
         try:
-            start = datetime.strptime(start, '%d.%m.%y %H:%M')
-            end = datetime.strptime(end, '%H:%M')
-            return start, end
+            return parse_dates(start, end)
         except ValueError:
             msg.showerror('Error', 'Date and hour should be in correct format "dd.mm.yy", "hh:mm", e.g. 26.02.20 19:30')
             return False
@@ -171,7 +356,7 @@ class Gui(tk.Tk):
         """Creates entry field
 
         Sets for it default value and binds it to GUI in set location (row, column) then populate variables dictionary
-        with entry name and corresponding variable (tkinter.StringVar)
+        with entry name and corresponding variable (tkinter.StringVar), changes of variable schedule update of preview
 
         Parameters
         ----------
@@ -186,6 +371,7 @@ class Gui(tk.Tk):
         """
 
         content = tk.StringVar(self, value=default)
+        content.trace_add('write', self.schedule_preview)
         tk.Entry(self, width=10, textvariable=content).grid(row=row, column=column, padx=10, pady=2, sticky='W')
         self.variables[name] = content
 
@@ -196,7 +382,26 @@ class Gui(tk.Tk):
         self.bind('<Escape>', self.close)
 
     def close(self, *_):
-        """Shutdowns application, *_ to ignore unused argument from ESC key bind"""
+        """Shutdowns application after submitted records are saved, *_ to ignore unused argument from ESC key bind
+
+        Keys are unbound and buttons and entries disabled, then main loop waits for pending results (see
+        close_when_saved), so window doesn't freeze while records are saved.
+        """
 
+        self.unbind('<Return>')
+        self.unbind('<Escape>')
+        for widget in self.winfo_children():
+            if isinstance(widget, (tk.Button, tk.Entry)):
+                widget.config(state='disabled')
+        self.closing = True
+        self.close_when_saved()
+
+    def close_when_saved(self):
+        """Shutdowns application when results of all submitted records were displayed, otherwise it is called by main
+        loop again (tkinter.Tk.after)"""
+
+        if self.pending:
+            self.after(50, self.close_when_saved)
+            return
         self.destroy()
         sys.exit()
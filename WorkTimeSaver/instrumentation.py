@@ -0,0 +1,186 @@
+"""Instrumentation Module
+
+Opt-in measurements of hot paths of submit, which show whether time goes into reading of file, parsing of lines, saving
+or formatting of summary. When instrumentation is enabled methods listed below are replaced with wrappers collecting
+number of calls, time spent in them (seconds) and their own counters:
+
+    * Document.process_file - whole submit.
+    * Document.get_lines - opening of document and reading of lines by consumer (lines).
+    * Document.sum_month - lines scanned (lines) and records parsed to Salary object (records), it includes time of
+      reading lines from get_lines.
+    * Document.save_data - objects saved (items), bytes appended to text document (bytes) and calls of fsync made by
+      storage (fsyncs, storage reports them by count function).
+    * Salary.sum_up - formatting of month summary.
+
+When it is disabled original methods are restored, so there is no overhead at all. It can be enabled from code by
+enable() or by environment variable WORKTIMESAVER_INSTRUMENT set before WorkTimeSaver is imported: "1" only enables it,
+any other value is path of JSON file where statistics are written when process exits ("{pid}" in path is replaced with
+process id, so each run can have its own file), e.g.
+
+    WORKTIMESAVER_INSTRUMENT=stats-{pid}.json worktimesaver add 26.02.20 8:00 16:30
+
+Modules used are: `atexit`, `collections`, `functools`, `json`, `os`, `time`, `document` and `salary`. It is required to
+provide them before running application.
+
+License:
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import atexit
+from collections import Counter, defaultdict
+from functools import wraps
+import json
+import os
+from time import perf_counter
+
+stats = defaultdict(Counter)
+originals = {}
+
+
+def count(name, **values):
+    """Adds values to counters of measured function with passed name (only when instrumentation is enabled)"""
+
+    if originals:
+        stats[name].update(values)
+
+
+def enable():
+    """Replaces measured methods with wrappers collecting statistics (nothing happens when it is already enabled)"""
+
+    from WorkTimeSaver.document import Document
+    from WorkTimeSaver.salary import Salary
+
+    if originals:
+        return
+    for cls, name, wrapper in ((Document, 'process_file', timed), (Document, 'get_lines', timed_lines),
+                               (Document, 'sum_month', counted_lines), (Document, 'save_data', counted_bytes),
+                               (Salary, 'sum_up', timed)):
+        method = cls.__dict__[name]
+        originals[cls, name] = method
+        setattr(cls, name, wrapper(f'{cls.__name__}.{name}', method))
+
+
+def disable():
+    """Restores original methods, collected statistics are kept"""
+
+    while originals:
+        (cls, name), method = originals.popitem()
+        setattr(cls, name, method)
+
+
+def is_enabled():
+    """Returns True when instrumentation is enabled"""
+
+    return bool(originals)
+
+
+def reset():
+    """Clears collected statistics"""
+
+    stats.clear()
+
+
+def snapshot():
+    """Returns dictionary with name of measured method as key and dictionary of its counters as value"""
+
+    return {name: dict(counters) for name, counters in stats.items()}
+
+
+def dump(path):
+    """Writes statistics with process id to JSON file ("{pid}" in path is replaced with process id)"""
+
+    with open(path.format(pid=os.getpid()), 'w') as f:
+        json.dump({'pid': os.getpid(), 'stats': snapshot()}, f, indent=2)
+
+
+def configure(value):
+    """Enables instrumentation according to value of environment variable (see module description)"""
+
+    if not value:
+        return
+    enable()
+    if value != '1':
+        atexit.register(dump, value)
+
+
+def timed(name, method):
+    """Returns wrapper of method counting its calls and time"""
+
+    @wraps(method)
+    def wrapper(*args, **kwargs):
+        start = perf_counter()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            count(name, calls=1, seconds=perf_counter() - start)
+    return wrapper
+
+
+def timed_lines(name, method):
+    """Returns wrapper of get_lines counting time of opening document and of reading each line"""
+
+    def read(lines):
+        try:
+            while True:
+                start = perf_counter()
+                line = next(lines, None)
+                count(name, seconds=perf_counter() - start, lines=line is not None)
+                if line is None:
+                    return
+                yield line
+        finally:
+            lines.close()
+
+    @wraps(method)
+    def wrapper(self):
+        start = perf_counter()
+        lines = method(self)
+        count(name, calls=1, seconds=perf_counter() - start)
+        return read(lines) if lines else lines
+    return wrapper
+
+
+def counted_lines(name, method):
+    """Returns wrapper of sum_month counting lines scanned and records added to Salary object"""
+
+    @wraps(method)
+    def wrapper(self, lines):
+        scanned = 0
+
+        def scan():
+            nonlocal scanned
+            for line in lines:
+                scanned += 1
+                yield line
+
+        days = self.salary.days_at_work
+        start = perf_counter()
+        try:
+            return method(self, scan())
+        finally:
+            count(name, calls=1, seconds=perf_counter() - start, lines=scanned,
+                  records=self.salary.days_at_work - days)
+    return wrapper
+
+
+def counted_bytes(name, method):
+    """Returns wrapper of save_data counting saved objects and bytes appended to text document"""
+
+    @wraps(method)
+    def wrapper(self, *data):
+        signature = getattr(self.storage, 'get_signature', None)
+        before = signature() if signature else None
+        start = perf_counter()
+        try:
+            return method(self, *data)
+        finally:
+            count(name, calls=1, seconds=perf_counter() - start, items=len(data))
+            if signature:
+                count(name, bytes=(signature() or (0,))[0] - (before or (0,))[0])
+    return wrapper
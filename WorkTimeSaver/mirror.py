@@ -0,0 +1,412 @@
+"""Mirror Module
+
+Storage backend for year files kept on slow or unreliable network mounts (e.g. network home directory), where every
+open or read of remote file costs tens of milliseconds or stalls. MirrorStorage keeps local copy (mirror) of year file
+in cache directory and works on it like TextStorage, so state of month, checkpoint and reading of lines are local:
+
+    * reading - signature (size and modification time) of remote file is checked once per storage object, mirror is
+      used while it is the same as after the last synchronization, otherwise remote file is downloaded again (when mount
+      isn't available mirror is used as it is).
+    * saving - data are appended to mirror and to local journal of pending appends ("YYYY.txt.pending"), then they are
+      flushed to remote file in background (after FLUSH_DELAY milliseconds, all at once, and when process exits).
+    * conflict - when remote file was changed by someone else before pending appends were flushed, they aren't written
+      to it. They are saved next to remote file ("YYYY.txt.conflict") for manual merge, ConflictError is reported and
+      mirror is downloaded again.
+
+Remote directory is accessed only through RemoteDirectory object, SlowDirectory is its stand-in adding latency to each
+operation of local directory (for tests and measurements). Backend is used like other storages, e.g.
+
+    Document(date, end_time, storage=functools.partial(MirrorStorage, remote='/mnt/home/user/work'))
+
+Modules used are: `atexit`, `collections`, `hashlib`, `json`, `os`, `sys`, `threading`, `time`, `rates` and
+`storage`. It is required to provide them before running application.
+
+License:
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import atexit
+from collections import Counter
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from WorkTimeSaver.rates import RATES_FILE
+from WorkTimeSaver.storage import TextStorage, locked, sync
+
+CACHE_DIRECTORY = os.path.join(os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache'),
+                               'WorkTimeSaver')
+FLUSH_DELAY = 1000
+
+
+class ConflictError(Exception):
+    """Error raised when remote file was changed before pending appends were flushed to it"""
+
+
+class RemoteDirectory:
+    """
+    A class giving access to files of remote directory, each method is single operation on remote file system.
+
+    ...
+
+    Attributes
+    ----------
+    path : str
+        path to directory
+
+    Methods
+    -------
+    get_signature(name)
+        returns size and modification time of file
+    read(name, offset=0)
+        returns content of file from offset
+    append(name, data)
+        appends bytes to file and syncs it
+    lock(name)
+        returns context manager holding exclusive lock of file
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def __repr__(self):
+        return f'<{type(self).__name__} "{self.path}">'
+
+    def get_signature(self, name):
+        """Returns tuple with size and modification time (ns) of file or None when it doesn't exist"""
+
+        try:
+            stat = os.stat(os.path.join(self.path, name))
+        except FileNotFoundError:
+            return None
+        return stat.st_size, stat.st_mtime_ns
+
+    def read(self, name, offset=0):
+        """Returns bytes of file from offset to its end"""
+
+        with open(os.path.join(self.path, name), 'rb') as f:
+            f.seek(offset)
+            return f.read()
+
+    def append(self, name, data):
+        """Appends bytes to file (created when it doesn't exist) and syncs it to disk"""
+
+        with open(os.path.join(self.path, name), 'ab') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def lock(self, name):
+        """Returns context manager holding exclusive lock of file (the same lock as TextStorage uses)"""
+
+        return locked(os.path.join(self.path, name + '.lock'))
+
+
+class SlowDirectory(RemoteDirectory):
+    """
+    A class of stand-in for network mount: local directory where each operation waits set time and is counted.
+
+    ...
+
+    Attributes
+    ----------
+    latency : float
+        seconds added to each operation
+    operations : collections.Counter
+        number of calls of each method
+    """
+
+    def __init__(self, path, latency=0.02):
+        super().__init__(path)
+        self.latency = latency
+        self.operations = Counter()
+
+    def wait(self, operation):
+        """Counts operation and waits set latency"""
+
+        self.operations[operation] += 1
+        time.sleep(self.latency)
+
+    def get_signature(self, name):
+        self.wait('get_signature')
+        return super().get_signature(name)
+
+    def read(self, name, offset=0):
+        self.wait('read')
+        return super().read(name, offset)
+
+    def append(self, name, data):
+        self.wait('append')
+        return super().append(name, data)
+
+    def lock(self, name):
+        self.wait('lock')
+        return super().lock(name)
+
+
+class Flusher:
+    """
+    A class flushing pending appends of mirrors to remote files in background.
+
+    ...
+
+    Attributes
+    ----------
+    delay : int
+        milliseconds after the first scheduled flush after which all pending storages are flushed
+    pending : dict
+        local path of mirror as key and MirrorStorage object as value
+    errors : list
+        exceptions raised by flushes done in background
+    lock : threading.Lock
+        lock held while pending storages are changed
+    timer : threading.Timer
+        timer of flush (None when nothing is pending)
+
+    Methods
+    -------
+    schedule(storage)
+        schedules flush of storage
+    flush()
+        flushes all pending storages, returns list of exceptions
+    """
+
+    def __init__(self, delay=FLUSH_DELAY):
+        self.delay = delay
+        self.pending = {}
+        self.errors = []
+        self.lock = threading.Lock()
+        self.timer = None
+        atexit.register(self.flush)
+
+    def __repr__(self):
+        return f'<Flusher after {self.delay} ms, {len(self.pending)} mirrors pending>'
+
+    def schedule(self, storage):
+        """Schedules flush of pending appends of storage after delay"""
+
+        with self.lock:
+            self.pending[storage.document] = storage
+            if self.timer is None:
+                self.timer = threading.Timer(self.delay / 1000, self.flush)
+                self.timer.daemon = True
+                self.timer.start()
+
+    def flush(self):
+        """Flushes all pending storages, exceptions (e.g. ConflictError or OSError when mount isn't available) are
+        printed to standard error, remembered in errors and returned as list, failed appends stay in journal (except
+        conflicting ones)"""
+
+        with self.lock:
+            if self.timer:
+                self.timer.cancel()
+                self.timer = None
+            pending, self.pending = self.pending, {}
+        errors = []
+        for storage in pending.values():
+            try:
+                storage.flush()
+            except Exception as error:
+                print(f'{storage.document} was not flushed: {error}', file=sys.stderr)
+                errors.append(error)
+        self.errors.extend(errors)
+        return errors
+
+
+flusher = Flusher()
+
+
+class MirrorStorage(TextStorage):
+    """
+    A class storing data of one year in remote text file through its local mirror.
+
+    ...
+
+    Attributes
+    ----------
+    remote : RemoteDirectory
+        directory with year file
+    name : str
+        name of year file (year and txt extension)
+    state : str
+        path of JSON file with signature of remote file after the last synchronization of mirror
+    journal : str
+        path of file with pending appends (bytes appended to mirror but not to remote file yet)
+    refreshed : bool
+        True when mirror was already compared with remote file by this object
+    flusher : Flusher
+        object flushing pending appends in background
+
+    Methods
+    -------
+    refresh()
+        downloads remote file to mirror when it was changed (once per object)
+    flush()
+        appends pending data to remote file
+    """
+
+    def __init__(self, year, remote='.', cache_directory=CACHE_DIRECTORY, durability=None, flusher=flusher):
+        """
+        Parameters
+        ----------
+        year : int
+            year of stored records
+        remote : str or RemoteDirectory, optional
+            remote directory with year files (default is current directory)
+        cache_directory : str, optional
+            local directory where mirrors are kept, each remote directory has its own subdirectory (default is
+            CACHE_DIRECTORY)
+        durability : str or GroupCommit, optional
+            durability of appends to mirror (see TextStorage)
+        flusher : Flusher, optional
+            object flushing pending appends (default is flusher of module)
+        """
+
+        super().__init__(year, durability)
+        self.remote = remote if isinstance(remote, RemoteDirectory) else RemoteDirectory(remote)
+        self.name = f'{year}.txt'
+        key = hashlib.blake2b(os.path.abspath(self.remote.path).encode(), digest_size=8).hexdigest()
+        directory = os.path.join(cache_directory, key)
+        os.makedirs(directory, exist_ok=True)
+        self.document = os.path.join(directory, self.name)
+        self.checkpoint = self.document + '.idx'
+        self.state = self.document + '.remote'
+        self.journal = self.document + '.pending'
+        self.rates_file = os.path.join(self.remote.path, RATES_FILE)
+        self.refreshed = False
+        self.flusher = flusher
+
+    def __repr__(self):
+        return f'<MirrorStorage "{self.name}" of {self.remote}>'
+
+    def get_lines(self):
+        self.refresh()
+        return super().get_lines()
+
+    def get_signature(self):
+        self.refresh()
+        return super().get_signature()
+
+    def load_checkpoint(self):
+        self.refresh()
+        return super().load_checkpoint()
+
+    def save_data(self, *data):
+        """Appends journal of pending appends and mirror with data, schedules flush to remote file
+
+        Journal is written (and synced unless durability is 'none') first, so data which reached mirror are always
+        flushed to remote file, even when process is stopped before the next write.
+        """
+
+        self.refresh()
+        with open(self.journal, 'a') as f:
+            f.write(''.join(f'{item}\n' for item in data))
+        if self.durability != 'none':
+            sync(self.journal)
+        super().save_data(*data)
+        self.flusher.schedule(self)
+
+    def load_state(self):
+        """Returns signature of remote file (list) after the last synchronization, None when file didn't exist, False
+        when mirror wasn't synchronized yet"""
+
+        try:
+            with open(self.state, 'r') as f:
+                return json.load(f)['remote']
+        except (OSError, ValueError, KeyError):
+            return False
+
+    def save_state(self, signature):
+        """Saves signature of remote file after synchronization"""
+
+        with open(self.state, 'w') as f:
+            f.write(json.dumps({'remote': list(signature) if signature else None}))
+
+    def has_pending(self):
+        """Returns True when there are appends which weren't flushed to remote file"""
+
+        return os.path.exists(self.journal) and os.path.getsize(self.journal) > 0
+
+    def refresh(self):
+        """Downloads remote file to mirror when its signature is different than after the last synchronization
+
+        It is done once per storage object. Mirror isn't replaced while it has pending appends (they are compared with
+        remote file by flush) or when remote file isn't available.
+        """
+
+        if self.refreshed:
+            return
+        self.refreshed = True
+        try:
+            signature = self.remote.get_signature(self.name)
+        except OSError:
+            return
+        state = self.load_state()
+        if state is not False and (list(signature) if signature else None) == state or self.has_pending():
+            return
+        self.download(signature)
+
+    def download(self, signature):
+        """Replaces mirror with content of remote file (removes it when remote file doesn't exist)"""
+
+        if signature is None:
+            if os.path.exists(self.document):
+                os.remove(self.document)
+        else:
+            data = self.remote.read(self.name)
+            with open(self.document + '.download', 'wb') as f:
+                f.write(data)
+            os.replace(self.document + '.download', self.document)
+        self.save_state(signature)
+
+    def flush(self):
+        """Appends pending data to remote file holding lock of mirror and of remote file
+
+        When signature of remote file after the last synchronization isn't known (mirror was never synchronized or its
+        state was lost), pending data are appended to remote file as it is now (unless it already ends with them) and
+        mirror is downloaded again. Mirror is downloaded as well when it doesn't match remote file after flush (e.g.
+        process was stopped after journal was written).
+
+        Raises
+        ------
+        ConflictError
+            when remote file was changed after the last synchronization (pending data are saved to conflict file next
+            to remote file and mirror is downloaded again)
+        OSError
+            when remote file isn't available (pending data stay in journal)
+        """
+
+        with locked(self.document + '.lock'):
+            if not self.has_pending():
+                return
+            with open(self.journal, 'rb') as f:
+                pending = f.read()
+            state = self.load_state()
+            with self.remote.lock(self.name):
+                signature = self.remote.get_signature(self.name)
+                synchronized = state is False or (list(signature) if signature else None) == state
+                flushed = bool(signature) and (state is False or signature[0] == (state[0] if state else 0) + len(
+                    pending)) and signature[0] >= len(pending) and self.remote.read(
+                    self.name, signature[0] - len(pending)) == pending
+                if not synchronized and not flushed:
+                    self.remote.append(self.name + '.conflict', pending)
+                    os.remove(self.journal)
+                    self.download(signature)
+                    raise ConflictError(f'{self.name} was changed in {self.remote.path}, records which were not saved '
+                                        f'to it are in {self.name}.conflict')
+                if not flushed:
+                    self.remote.append(self.name, pending)
+                signature = self.remote.get_signature(self.name)
+            if state is False or not os.path.exists(self.document) or os.path.getsize(self.document) != signature[0]:
+                self.download(signature)
+            else:
+                self.save_state(signature)
+            os.remove(self.journal)
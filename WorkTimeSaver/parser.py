@@ -0,0 +1,207 @@
+"""Parser Module
+
+Module responsible for reading lines of year file. Each line is parsed in one pass into Entry object with its kind and
+numbers stored as integers. Lines are processed as bytes (str is encoded), records written by application are matched by
+single compiled pattern and their numbers are read straight from digits. Lines changed manually, which are not in exact
+record format, are searched the same way as it was done by Document before (first "..:..h" after tab for time and two
+characters before tab for month) so their meaning stays unchanged.
+
+Modules used are: `io` and `re`. It is required to provide them before running application.
+
+It contains functions:
+
+    * parse_line - parses line (str, bytes or memoryview) to Entry object.
+    * parse_irregular - parses line which isn't in exact record format.
+    * parse_file - yields Entry objects for next lines of file opened in binary mode.
+    * parse_buffer - yields Entry objects for next lines from bytes buffer.
+    * fold_entry - updates records of month with next line the way Document sums month.
+    * parse_months - yields Entry objects for next lines of file with records of month summed at them.
+
+Time of month is collected the same way by Document (see Document.sum_month and storage.fold_lines) and by tools
+reading whole files (repair, payroll, export and query): records following each other are summed, any other line (e.g.
+manual note, blank line or record without time) starts month again and summary closes it. Summary written by
+application contains therefore only records between the last such line and itself.
+
+License:
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+from io import BytesIO
+import re
+
+RECORD = 'record'
+SUMMARY = 'summary'
+SEPARATOR = 'separator'
+BLANK = 'blank'
+TEXT = 'text'
+
+RECORD_PATTERN = re.compile(rb'\d\d\.\d\d\t\t\d\d:\d\d-\d\d:\d\d\t\d\d:\d\dh')
+SUMMARY_PATTERN = re.compile(rb'(\d+)\t\t\t\t\d+:\d\dh')
+MINUTES_PATTERN = re.compile(rb'\t(..:..)h')
+MONTH_PATTERN = re.compile(rb'.(..)\t')
+ZERO = ord('0') * 11
+
+
+class Entry:
+    """
+    A class representing parsed line of file.
+
+    ...
+
+    Attributes
+    ----------
+    kind : str
+        type of line: 'record', 'summary', 'separator', 'blank' or 'text' (anything else)
+    day : int
+        day of record (None when line isn't in exact record format)
+    month : int
+        month number found in line (0 when it wasn't found)
+    start : int
+        minute of day when work started (None when line isn't in exact record format)
+    end : int
+        minute of day when work ended (None when line isn't in exact record format)
+    minutes : int
+        time spent at work stored in line (None when it wasn't found)
+    days : int
+        number of days at work from summary line (None for other kinds)
+    """
+
+    __slots__ = ('kind', 'day', 'month', 'start', 'end', 'minutes', 'days')
+
+    def __init__(self, kind, day=None, month=0, start=None, end=None, minutes=None, days=None):
+        self.kind = kind
+        self.day = day
+        self.month = month
+        self.start = start
+        self.end = end
+        self.minutes = minutes
+        self.days = days
+
+    def __repr__(self):
+        return f'<Entry {self.kind} day {self.day} month {self.month} from {self.start} to {self.end} minute ' \
+            f'({self.minutes} minutes)>'
+
+
+def parse_line(line):
+    """Parses line of file
+
+    Parameters
+    ----------
+    line : str, bytes or memoryview
+        file line (with or without line ending)
+
+    Returns
+    -------
+    Entry
+        object with kind of line and numbers found in it
+    """
+
+    if isinstance(line, str):
+        line = line.encode()
+    if RECORD_PATTERN.match(line):
+        return Entry(RECORD, line[0] * 10 + line[1] - ZERO, line[3] * 10 + line[4] - ZERO,
+                     (line[7] * 10 + line[8] - ZERO) * 60 + line[10] * 10 + line[11] - ZERO,
+                     (line[13] * 10 + line[14] - ZERO) * 60 + line[16] * 10 + line[17] - ZERO,
+                     (line[19] * 10 + line[20] - ZERO) * 60 + line[22] * 10 + line[23] - ZERO)
+    return parse_irregular(line)
+
+
+def parse_irregular(line):
+    """Parses line which isn't in exact record format searching it for time and month like Document did before"""
+
+    content = bytes(line).strip()
+    if not content:
+        return Entry(BLANK)
+    if not content.strip(b'-'):
+        return Entry(SEPARATOR)
+    entry = Entry(TEXT)
+    result = MINUTES_PATTERN.search(line)
+    if result:
+        try:
+            hours, minutes = result.group(1).split(b':')
+            entry.minutes = int(hours) * 60 + int(minutes)
+        except ValueError:
+            pass
+    result = MONTH_PATTERN.search(line)
+    if result:
+        try:
+            entry.month = int(result.group(1))
+        except ValueError:
+            pass
+    summary = SUMMARY_PATTERN.match(line)
+    if summary:
+        entry.kind = SUMMARY
+        entry.days = int(summary.group(1))
+    elif entry.minutes is not None:
+        entry.kind = RECORD
+    return entry
+
+
+def parse_file(file):
+    """Yields Entry objects for next lines of file
+
+    Parameters
+    ----------
+    file : io.BufferedReader
+        file opened in binary mode
+
+    Yields
+    ------
+    Entry
+        parsed line of file
+    """
+
+    for line in file:
+        yield parse_line(line)
+
+
+def parse_buffer(buffer):
+    """Yields Entry objects for next lines from bytes buffer (bytes, bytearray or memoryview)"""
+
+    yield from parse_file(BytesIO(buffer))
+
+
+def fold_entry(month, records, entry):
+    """Returns month and list of records summed to it after next line
+
+    Parameters
+    ----------
+    month : int
+        month number of the last summed record (None when month is closed)
+    records : list
+        Entry objects of records summed to month so far (list is extended in place)
+    entry : Entry
+        parsed next line
+
+    Returns
+    -------
+    tuple
+        month number and list of records, new empty list when line starts month again, None and empty list after
+        summary
+    """
+
+    if entry.kind == SUMMARY:
+        return None, []
+    if entry.kind == RECORD and entry.minutes:
+        records.append(entry)
+        return entry.month, records
+    return month, []
+
+
+def parse_months(file):
+    """Yields tuples with Entry object for next line of file, number of month and list of records (Entry objects)
+    summed to it at this line (see fold_entry), summary gets records of month which it closes"""
+
+    month, records = None, []
+    for entry in parse_file(file):
+        if entry.kind == SUMMARY:
+            yield entry, month, records
+        month, records = fold_entry(month, records, entry)
+        if entry.kind != SUMMARY:
+            yield entry, month, records
@@ -0,0 +1,171 @@
+"""Payroll Module
+
+Headless month-end payroll for many employees. It walks directory tree looking for year files ("YYYY.txt"), parses each
+of them in separate process (files are spread over all cores) and calculates salary for every month found in records.
+Results are streamed as CSV or JSON lines in the same order as files were found. File which couldn't be processed is
+reported in its own row with error message and doesn't stop the run.
+
+Usage:
+
+    python -m WorkTimeSaver.payroll DIRECTORY [--format csv|json] [--workers N]
+
+Modules used are: `argparse`, `concurrent.futures`, `csv`, `json`, `os`, `re`, `sys`, `archive`, `parser` and
+`salary`. It is required to provide them before running application.
+
+License:
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import csv
+import json
+import os
+import re
+import sys
+from WorkTimeSaver.archive import ARCHIVE_EXTENSION, open_year
+from WorkTimeSaver.parser import SUMMARY, parse_months
+from WorkTimeSaver.salary import Salary
+
+FIELDS = ('file', 'year', 'month', 'days', 'minutes', 'gross', 'net', 'error')
+YEAR_FILE = re.compile(r'\d{4}\.txt')
+
+
+def find_files(directory):
+    """Yields paths of year files from directory tree (in sorted order), year which has only archive (see archive
+    module) is yielded as path of its year file"""
+
+    for root, directories, files in os.walk(directory):
+        directories.sort()
+        names = {name.removesuffix(ARCHIVE_EXTENSION) for name in files}
+        for name in sorted(names):
+            if YEAR_FILE.fullmatch(name):
+                yield os.path.join(root, name)
+
+
+def month_salaries(file):
+    """Sums records from year file to Salary objects of their months
+
+    Month gets records summed at its summary (or at the end of file) like in summary written by Document, i.e. records
+    before manual note or blank line aren't counted (see parser.fold_entry). Months of the same number in file (e.g. of
+    synthetic file with many years) are added together.
+
+    Parameters
+    ----------
+    file : io.BufferedReader
+        year file opened in binary mode
+
+    Returns
+    -------
+    dict
+        month number as key and Salary object with time from its records as value (sorted by month)
+    """
+
+    salaries = {}
+    month, records = None, []
+    for entry, month, records in parse_months(file):
+        if entry.kind == SUMMARY and month is not None:
+            sum_records(records, salaries.setdefault(month, Salary()))
+    if month is not None:
+        sum_records(records, salaries.setdefault(month, Salary()))
+    return dict(sorted(salaries.items()))
+
+
+def sum_records(records, salary=None):
+    """Adds time of records (Entry objects) to Salary object (new one when it is None) and returns it"""
+
+    salary = Salary() if salary is None else salary
+    for record in records:
+        salary.update_work(record.minutes)
+    return salary
+
+
+def summarize_file(path):
+    """Calculates salary for each month from year file
+
+    Parameters
+    ----------
+    path : str
+        path to year file
+
+    Returns
+    -------
+    list
+        a list with dictionary (keys from FIELDS) for each month, single row with error message when file couldn't be
+        processed
+    """
+
+    name = os.path.basename(path)
+    year = int(name[:4]) if YEAR_FILE.fullmatch(name) else None
+    try:
+        with open_year(path) as f:
+            salaries = month_salaries(f)
+    except Exception as error:
+        return [dict.fromkeys(FIELDS, None) | {'file': path, 'year': year, 'error': f'{type(error).__name__}: {error}'}]
+    rows = []
+    for month, salary in salaries.items():
+        money = salary.calculate_salary()
+        rows.append({'file': path, 'year': year, 'month': month, 'days': salary.days_at_work,
+                     'minutes': salary.worktime, 'gross': round(sum(money), 2),
+                     'net': round(salary.deduct_tax(money), 2), 'error': None})
+    return rows
+
+
+def run(paths, output=sys.stdout, output_format='csv', workers=None):
+    """Processes year files in pool of processes and writes results to output as soon as they are ready
+
+    Parameters
+    ----------
+    paths : iterable
+        paths to year files
+    output : io.TextIOBase, optional
+        stream where results are written (default is sys.stdout)
+    output_format : str, optional
+        'csv' or 'json' (JSON object in each line) (default is 'csv')
+    workers : int, optional
+        number of processes (default is number of processors)
+
+    Returns
+    -------
+    int
+        number of files which couldn't be processed
+    """
+
+    if output_format == 'csv':
+        writer = csv.DictWriter(output, FIELDS)
+        writer.writeheader()
+        write = writer.writerow
+    else:
+        def write(row):
+            output.write(json.dumps(row) + '\n')
+    failures = 0
+    with ProcessPoolExecutor(workers) as executor:
+        for rows in executor.map(summarize_file, paths, chunksize=16):
+            for row in rows:
+                failures += row['error'] is not None
+                write(row)
+    return failures
+
+
+def main(argv=None, prog=None):
+    """Parses command line arguments and runs payroll, returns exit code (1 when any file failed), prog is
+    program name displayed in usage"""
+
+    description = 'Calculate month salaries from year files in directory tree.'
+    arguments = argparse.ArgumentParser(prog=prog, description=description)
+    arguments.add_argument('directory', help='directory searched for year files (YYYY.txt)')
+    arguments.add_argument('--format', choices=('csv', 'json'), default='csv', help='output format (default is csv)')
+    arguments.add_argument('--workers', type=int, help='number of processes (default is number of processors)')
+    options = arguments.parse_args(argv)
+    failures = run(find_files(options.directory), output_format=options.format, workers=options.workers)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,213 @@
+"""Query Module
+
+Answers questions about work time of many months and years, e.g. "how many hours did I work from March 2019 to February
+2021", without parsing all records each time. For every year file totals of its months (minutes with deducted breaks,
+days, salary before and after tax) are kept in rollup index (JSON file "WorkTimeSaver.idx" next to year files) together
+with size and modification time of file. Query takes months from index and parses only year files which were changed
+(or are not indexed yet), then index is updated.
+
+Usage:
+
+    python -m WorkTimeSaver.query FIRST [LAST] [--directory DIR]     - months between FIRST and LAST (YYYY-MM)
+    python -m WorkTimeSaver.query --ytd [--year 2020] [--directory DIR] - months of year to date
+
+Modules used are: `argparse`, `datetime`, `json`, `os`, `sys`, `tempfile`, `archive`, `payroll` and `salary`. It is
+required to provide them before running application.
+
+License:
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import argparse
+from datetime import datetime
+import json
+import os
+import sys
+import tempfile
+from WorkTimeSaver.archive import get_signature, open_year
+from WorkTimeSaver.payroll import month_salaries
+from WorkTimeSaver.salary import Salary
+
+INDEX_FILE = 'WorkTimeSaver.idx'
+FIELDS = ('year', 'month', 'minutes', 'days', 'gross', 'net')
+
+
+class MonthIndex:
+    """
+    A class keeping totals of months of year files.
+
+    ...
+
+    Attributes
+    ----------
+    path : str
+        path to JSON file with index
+    files : dict
+        absolute path of year file as key and dictionary with its size, mtime and months (lists of month, minutes, days,
+        gross and net) as value
+    changed : bool
+        True when index was updated after it had been loaded
+
+    Methods
+    -------
+    get_months(document)
+        returns totals of months of year file (parses it only when it was changed)
+    save()
+        writes index to file when it was changed
+    """
+
+    def __init__(self, path=INDEX_FILE):
+        """
+        Parameters
+        ----------
+        path : str, optional
+            path to JSON file with index, it is created when it doesn't exist (default is INDEX_FILE)
+        """
+
+        self.path = path
+        self.changed = False
+        try:
+            with open(path, 'r') as f:
+                self.files = json.load(f)
+        except (OSError, ValueError):
+            self.files = {}
+
+    def __repr__(self):
+        return f'<MonthIndex "{self.path}" with {len(self.files)} files>'
+
+    def get_months(self, document):
+        """Returns list of lists with month, minutes, days, gross and net salary of year file (empty when file doesn't
+        exist), file is parsed only when its size or modification time (or of its archive, see archive module) is
+        different than in index"""
+
+        key = os.path.abspath(document)
+        signature = get_signature(document)
+        if signature is None:
+            if self.files.pop(key, None) is not None:
+                self.changed = True
+            return []
+        entry = self.files.get(key)
+        if entry and (entry['size'], entry['mtime']) == signature:
+            return entry['months']
+        with open_year(document) as f:
+            salaries = month_salaries(f)
+        months = []
+        for month, salary in salaries.items():
+            money = salary.calculate_salary()
+            months.append([month, salary.worktime, salary.days_at_work, sum(money), salary.deduct_tax(money)])
+        self.files[key] = {'size': signature[0], 'mtime': signature[1], 'months': months}
+        self.changed = True
+        return months
+
+    def save(self):
+        """Writes index to file (atomically replacing previous one) when it was changed"""
+
+        if not self.changed:
+            return
+        directory = os.path.dirname(os.path.abspath(self.path))
+        with tempfile.NamedTemporaryFile('w', dir=directory, delete=False) as f:
+            json.dump(self.files, f)
+        os.replace(f.name, self.path)
+        self.changed = False
+
+
+def query(first, last, directory='.', index=None):
+    """Returns totals of each month between passed months (inclusive) from year files in directory
+
+    Parameters
+    ----------
+    first : tuple
+        year and month of beginning of range
+    last : tuple
+        year and month of end of range
+    directory : str, optional
+        directory with year files (default is current directory)
+    index : MonthIndex, optional
+        index of months, by default index from INDEX_FILE in directory is used and saved after query
+
+    Returns
+    -------
+    list
+        dictionaries (keys from FIELDS) for months with records sorted by date
+    """
+
+    own_index = index is None
+    if own_index:
+        index = MonthIndex(os.path.join(directory, INDEX_FILE))
+    rows = []
+    for year in range(first[0], last[0] + 1):
+        for month, minutes, days, gross, net in index.get_months(os.path.join(directory, f'{year}.txt')):
+            if first <= (year, month) <= last:
+                rows.append(dict(zip(FIELDS, (year, month, minutes, days, gross, net))))
+    if own_index:
+        index.save()
+    return rows
+
+
+def year_to_date(year=None, directory='.', index=None):
+    """Returns totals of months (see query) from January to current month of year (default is current year)"""
+
+    today = datetime.now()
+    year = today.year if year is None else year
+    return query((year, 1), (year, today.month if year == today.year else 12), directory, index)
+
+
+def total(rows):
+    """Returns dictionary with sum of minutes, days, gross and net salary of rows returned by query"""
+
+    return {field: sum(row[field] for row in rows) for field in FIELDS[2:]}
+
+
+def format_rows(rows):
+    """Returns string with table of months and their total"""
+
+    currency = Salary().get_currency()
+    lines = []
+    for name, row in [(f'{row["month"]:02}.{row["year"]}', row) for row in rows] + [('Total', total(rows))]:
+        lines.append(f'{name:<10}{row["days"]:>6} days{row["minutes"] // 60:>8}:{row["minutes"] % 60:02}h'
+                     f'{row["gross"]:>14.2f}{currency}{row["net"]:>14.2f}{currency} after tax')
+    return '\n'.join(lines) + '\n'
+
+
+def parse_month(text):
+    """Converts string in format YYYY-MM to tuple with year and month, raises ValueError otherwise"""
+
+    year, separator, month = text.partition('-')
+    if not separator or len(year) != 4 or not year.isdigit() or not month.isdigit() or not 1 <= int(month) <= 12:
+        raise ValueError(f'Incorrect month "{text}"')
+    return int(year), int(month)
+
+
+def main(argv=None, prog=None):
+    """Parses command line arguments and prints totals of months, returns exit code (1 when no month was found), prog
+    is program name displayed in usage"""
+
+    description = 'Sum work time and salary of months from year files.'
+    arguments = argparse.ArgumentParser(prog=prog, description=description)
+    arguments.add_argument('first', nargs='?', type=parse_month, help='first month in format YYYY-MM, e.g. 2019-03')
+    arguments.add_argument('last', nargs='?', type=parse_month, help='last month in format YYYY-MM (default is first)')
+    arguments.add_argument('--ytd', action='store_true', help='months of year to date')
+    arguments.add_argument('--year', type=int, help='year of --ytd (default is current)')
+    arguments.add_argument('--directory', default='.', help='directory with year files (default is current)')
+    options = arguments.parse_args(argv)
+    if options.ytd:
+        rows = year_to_date(options.year, options.directory)
+    elif options.first:
+        rows = query(options.first, options.last or options.first, options.directory)
+    else:
+        arguments.error('pass range of months or --ytd')
+    if not rows:
+        print('There are no records in passed months.')
+        return 1
+    print(format_rows(rows), end='')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,147 @@
+"""Rates Module
+
+Historical exchange rates of salary currency used in month summaries. Rates are kept in local CSV file (by default
+"rates.csv" next to year files) with rows of date, currency and rate, e.g.
+
+    date,currency,rate
+    2020-01-31,PLN,0.4312
+    2020-01-31,EUR,0.1007
+    2020-02-28,PLN,0.4188
+
+Rate tells how much of currency is paid for one unit of salary currency. Month is converted with the last rate dated in
+this month or before it. File is loaded once into RateTable (for each currency sorted compact arrays of dates and rates
+searched with binary search) and reused as long as its size and modification time don't change, so reports over many
+months and employees don't read it again. Results of lookups are memoized per currency and month. When file doesn't
+exist or has no rate for month, fixed rate from DEFAULT_RATES is used (as before).
+
+Modules used are: `array`, `bisect`, `csv` and `os`. It is required to provide them before running application.
+
+License:
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+from array import array
+from bisect import bisect_right
+import csv
+import os
+
+RATES_FILE = 'rates.csv'
+DEFAULT_RATES = {'PLN': 0.41}
+
+tables = {}
+
+
+class RateTable:
+    """
+    A class with historical exchange rates of currencies.
+
+    ...
+
+    Attributes
+    ----------
+    dates : dict
+        currency as key and sorted array of dates (integers YYYYMMDD) as value
+    rates : dict
+        currency as key and array of rates (in order of dates) as value
+    cache : dict
+        memoized rates with tuple (currency, year, month) as key
+
+    Methods
+    -------
+    from_file(path)
+        returns table with rates loaded from CSV file
+    get_rate(currency, year, month)
+        returns rate of currency in month or None when it isn't known
+    """
+
+    def __init__(self, rows):
+        """
+        Parameters
+        ----------
+        rows : iterable
+            tuples with date ('YYYY-MM-DD'), currency and rate (strings or numbers), rows with date in other format
+            (e.g. header) are skipped
+
+        Raises
+        ------
+        ValueError
+            when rate is not a number
+        """
+
+        collected = {}
+        for date, currency, rate in rows:
+            date = str(date).strip()
+            if len(date) != 10 or not date.replace('-', '').isdigit():
+                continue
+            collected.setdefault(currency.strip(), []).append((int(date.replace('-', '')), float(rate)))
+        self.dates, self.rates = {}, {}
+        for currency, values in collected.items():
+            values.sort()
+            self.dates[currency] = array('l', [date for date, _ in values])
+            self.rates[currency] = array('d', [rate for _, rate in values])
+        self.cache = {}
+
+    def __repr__(self):
+        return f'<RateTable of {", ".join(self.dates)}>'
+
+    @classmethod
+    def from_file(cls, path):
+        """Returns RateTable with rates from CSV file (date, currency, rate)"""
+
+        with open(path, 'r', newline='') as f:
+            return cls(row[:3] for row in csv.reader(f) if len(row) >= 3)
+
+    def get_rate(self, currency, year, month):
+        """Returns the last rate of currency dated in passed month or before it, None when there is no such rate"""
+
+        key = currency, year, month
+        if key not in self.cache:
+            dates = self.dates.get(currency)
+            index = bisect_right(dates, year * 10000 + month * 100 + 99) - 1 if dates else -1
+            self.cache[key] = self.rates[currency][index] if index >= 0 else None
+        return self.cache[key]
+
+
+def get_table(path=RATES_FILE):
+    """Returns RateTable loaded from file (the same object while file isn't changed) or None when file doesn't exist"""
+
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        tables.pop(path, None)
+        return None
+    signature = stat.st_size, stat.st_mtime_ns
+    if path not in tables or tables[path][0] != signature:
+        tables[path] = signature, RateTable.from_file(path)
+    return tables[path][1]
+
+
+def get_rate(currency, period=None, path=RATES_FILE):
+    """Returns exchange rate of currency
+
+    Parameters
+    ----------
+    currency : str
+        name of currency, e.g. 'PLN'
+    period : tuple, optional
+        year and month of converted salary, when omitted default rate is returned
+    path : str, optional
+        path to CSV file with rates (default is RATES_FILE)
+
+    Returns
+    -------
+    float
+        rate from file for month, otherwise rate from DEFAULT_RATES
+    None
+        when rate of currency isn't known
+    """
+
+    table = get_table(path) if period else None
+    rate = table.get_rate(currency, *period) if table else None
+    return DEFAULT_RATES.get(currency) if rate is None else rate
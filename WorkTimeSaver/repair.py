@@ -0,0 +1,141 @@
+"""Repair Module
+
+Rebuilds month summaries of year file which was edited manually. File is read once, line after line, and time of month
+is collected from records the same way as Document does it (records following each other, any other line starts month
+again, see parser.fold_entry). Each summary met in file is replaced with the one calculated from these records. Lines
+are written to temporary file in the same directory as they come, so memory usage doesn't depend on size of file.
+Temporary file replaces original one (atomically) only when any summary has changed. File is locked the same way as by
+Document during whole operation. Summaries are exchanged with rates of month of their records and year from name of
+file, rates are read from file next to year file (see rates module).
+
+Usage:
+
+    python -m WorkTimeSaver.repair FILE [FILE ...]
+
+Modules used are: `argparse`, `locale`, `os`, `re`, `shutil`, `sys`, `tempfile`, `parser`, `rates`, `salary` and
+`storage`. It is required to provide them before running application.
+
+License:
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import argparse
+import locale
+import os
+import re
+import shutil
+import sys
+import tempfile
+from WorkTimeSaver.parser import SUMMARY, fold_entry, parse_line
+from WorkTimeSaver.rates import RATES_FILE
+from WorkTimeSaver.salary import Salary
+from WorkTimeSaver.storage import locked
+
+YEAR_FILE = re.compile(r'(\d{4})\.txt')
+
+
+def rebuild_summaries(path):
+    """Recalculates all month summaries in year file
+
+    Parameters
+    ----------
+    path : str
+        path to year file
+
+    Returns
+    -------
+    bool
+        True when any summary was changed and file was replaced, otherwise False
+    """
+
+    directory = os.path.dirname(os.path.abspath(path))
+    name = YEAR_FILE.fullmatch(os.path.basename(path))
+    with locked(path + '.lock'):
+        with open(path, 'rb') as source, tempfile.NamedTemporaryFile('wb', dir=directory, delete=False) as target:
+            try:
+                changed = copy_rebuilt(source, target, int(name.group(1)) if name else None,
+                                       os.path.join(directory, RATES_FILE))
+            except BaseException:
+                target.close()
+                os.remove(target.name)
+                raise
+        if changed:
+            shutil.copymode(path, target.name)
+            os.replace(target.name, path)
+        else:
+            os.remove(target.name)
+    return changed
+
+
+def copy_rebuilt(source, target, year=None, rates_file=RATES_FILE):
+    """Copies lines from source to target file replacing summaries with recalculated ones
+
+    Parameters
+    ----------
+    source : io.BufferedReader
+        year file opened in binary mode
+    target : io.BufferedWriter
+        file opened in binary mode where lines are written
+    year : int, optional
+        year of records used with their month to find exchange rates (fixed rates are used when it is omitted)
+    rates_file : str, optional
+        path to CSV file with exchange rates (default is RATES_FILE in current directory)
+
+    Returns
+    -------
+    bool
+        True when any summary was different than recalculated one, otherwise False
+    """
+
+    encoding = locale.getpreferredencoding(False)
+    changed = False
+    month, records = None, []
+    line = source.readline()
+    while line:
+        entry = parse_line(line)
+        if entry.kind != SUMMARY:
+            month, records = fold_entry(month, records, entry)
+            target.write(line)
+            line = source.readline()
+            continue
+        salary = Salary(rates_file)
+        for record in records:
+            salary.update_work(record.minutes)
+        salary.period = (year, month) if year and month else None
+        block = [line]
+        line = source.readline()
+        for prefix in (b'\t\t\t\t', b'After tax:'):
+            if not line.startswith(prefix):
+                break
+            block.append(line)
+            line = source.readline()
+        salary.is_exchanged = len(block) < 2 or b'(' in block[1]
+        summary = [text.encode(encoding) for text in salary.sum_up().split('\n')]
+        rebuilt = [text + old[len(old.rstrip(b'\r\n')):] for text, old in zip(summary, block)]
+        changed = changed or rebuilt != block
+        target.writelines(rebuilt)
+        month, records = fold_entry(month, records, entry)
+    return changed
+
+
+def main(argv=None, prog=None):
+    """Parses command line arguments and rebuilds summaries of passed files, returns exit code (prog is program
+    name displayed in usage)"""
+
+    description = 'Recalculate month summaries of manually edited year files.'
+    arguments = argparse.ArgumentParser(prog=prog, description=description)
+    arguments.add_argument('files', nargs='+', help='year files (YYYY.txt)')
+    options = arguments.parse_args(argv)
+    for path in options.files:
+        print(f'{path}: {"rebuilt" if rebuild_summaries(path) else "unchanged"}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
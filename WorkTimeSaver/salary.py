@@ -3,7 +3,7 @@
 Module responsible for storing time spent by employee at work in current month. According to this time and basic
 information included, e.g. hourly rate, overtime, currency, exchange rate calculation of salary is performed. It deducts
 unpaid food breaks from total time and taxes from final amount. It also covers method needed for month summary which
-will be logged to file.
+will be logged to file. Salary is exchanged with historical rate of its month (see rates module) when month is known.
 
 License:
 THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
@@ -15,6 +15,8 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
 
+from WorkTimeSaver.rates import RATES_FILE, get_rate
+
 
 class Salary:
     """
@@ -26,10 +28,24 @@ class Salary:
     ----------
     rate : int
         money earned per hour
+    overtime : float
+        monthly limit of hours paid on normal rate, hours above it are paid with bonus
+    bonus : float
+        multiplier of rate for hours above overtime limit
+    standard_tax : float
+        tax deducted from salary on normal rate
+    overtime_tax : float
+        tax deducted from salary for extra hours
     currency : str
         name of salary currency
     is_exchanged : bool
         True if salary should be exchanged to another currency and saved to file otherwise False
+    exchange_currencies : list
+        names of currencies salary is exchanged to
+    period : tuple
+        year and month of salary used to find exchange rates (None when rates are fixed)
+    rates_file : str
+        path to CSV file with historical exchange rates
     worktime : int
         number of minutes spent at work in current month
     days_at_work : int
@@ -46,17 +62,31 @@ class Salary:
     deduct_tax(salary)
         from passed tuple with salary deduct tax for normal rate and extra hours then returns total earning
     exchange_currency(amount)
-        multiplies set amount by currency rate and returns it in string with its name
+        multiplies set amount by rates of currencies and returns it in string with their names
     get_currency()
         returns string with currency of salary
     """
 
-    def __init__(self):
-        """Covers crucial data needed for salary calculation."""
+    def __init__(self, rates_file=RATES_FILE):
+        """Covers crucial data needed for salary calculation.
+
+        Parameters
+        ----------
+        rates_file : str, optional
+            path to CSV file with historical exchange rates, it should be placed next to year files (default is
+            RATES_FILE in current directory)
+        """
 
         self.rate = 250
+        self.overtime = 162.5
+        self.bonus = 1.5
+        self.standard_tax = 0.23
+        self.overtime_tax = 0.35
         self.currency = 'NOK'
         self.is_exchanged = True
+        self.exchange_currencies = ['PLN']
+        self.period = None
+        self.rates_file = rates_file
         self.worktime = 0
         self.days_at_work = 0
 
@@ -74,15 +104,16 @@ class Salary:
         -------
         str
             a string with information about days spent at work, number of hours, salary before tax and salary after
-            tax. It also includes exchanged currency values when is_exchanged attribute is set to True.
+            tax. It also includes exchanged currency values when is_exchanged attribute is set to True (and rate of any
+            currency is known).
         """
 
         salary = self.calculate_salary()
         deducted = self.deduct_tax(salary)
         e1, e2 = '', ''
         if self.is_exchanged:
-            e1 = f' ({self.exchange_currency(sum(salary))})'
-            e2 = f' ({self.exchange_currency(deducted)})'
+            e1, e2 = self.exchange_currency(sum(salary)), self.exchange_currency(deducted)
+            e1, e2 = f' ({e1})' if e1 else '', f' ({e2})' if e2 else ''
         return f'{self.days_at_work}\t\t\t\t{self.worktime // 60}:{self.worktime % 60:02}h\n\t\t\t\t{sum(salary):.2f}' \
             f'{self.currency}{e1}\nAfter tax:\t\t\t{deducted:.2f}{self.currency}{e2}\n'
 
@@ -96,13 +127,11 @@ class Salary:
         """
 
         hours = self.worktime / 60
-        overtime = 162.5
-        bonus_percent = 1.5
         extra = 0
-        if hours > overtime:
-            extra = hours - overtime
+        if hours > self.overtime:
+            extra = hours - self.overtime
             hours -= extra
-        return (hours * self.rate, extra * self.rate * bonus_percent)
+        return (hours * self.rate, extra * self.rate * self.bonus)
 
     def update_work(self, minutes):
         """Updates worktime with minutes deducted by free break according to set conditions, increases days_at_work
@@ -134,12 +163,10 @@ class Salary:
             total salary after tax deduction
         """
 
-        standard = 0.23
-        overtime = 0.35
-        return salary[0] * (1 - standard) + salary[1] * (1 - overtime)
+        return salary[0] * (1 - self.standard_tax) + salary[1] * (1 - self.overtime_tax)
 
     def exchange_currency(self, amount):
-        """Exchanges salary to set currency
+        """Exchanges salary to set currencies with rates of its period (currencies without known rate are skipped)
 
         Parameters
         ----------
@@ -149,12 +176,15 @@ class Salary:
         Returns
         -------
         str
-            salary multiplied by exchange currency rate with currency name
+            salary multiplied by exchange rate with currency name for each currency separated by comma
         """
 
-        rate = 0.41
-        currency = 'PLN'
-        return f'{amount * rate:.2f}{currency}'
+        exchanged = []
+        for currency in self.exchange_currencies:
+            rate = get_rate(currency, self.period, self.rates_file)
+            if rate is not None:
+                exchanged.append(f'{amount * rate:.2f}{currency}')
+        return ', '.join(exchanged)
 
     def get_currency(self):
         """Returns string with currency of salary"""
@@ -0,0 +1,66 @@
+"""Simulation Module
+
+What-if calculation of salaries for many contract parameters at once, e.g. during negotiations. Worktimes of months
+(minutes, like Salary.worktime) are evaluated against every combination of passed hourly rates, overtime limits, bonus
+multipliers and taxes in single vectorized NumPy call. Each parameter becomes separate axis of result, so grid of
+thousands combinations doesn't need Python loop. Arithmetic is done in the same order as in Salary methods, so values
+are exactly the same as calculated by Salary object with the same attributes.
+
+NumPy is optional dependency of application, it is installed with `pip install WorkTimeSaver[simulation]`.
+
+Modules used are: `numpy` and `salary`. It is required to provide them before running application.
+
+License:
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import numpy as np
+from WorkTimeSaver.salary import Salary
+
+PARAMETERS = ('rate', 'overtime', 'bonus', 'standard_tax', 'overtime_tax')
+
+
+def simulate(worktimes, **parameters):
+    """Calculates salary before and after tax for every combination of worktime and passed parameters
+
+    Parameters
+    ----------
+    worktimes : array_like
+        minutes at work (with deducted breaks) of each month
+    parameters : array_like, optional
+        values of Salary attributes (see PARAMETERS): rate, overtime, bonus, standard_tax and overtime_tax, each of them
+        is scalar or one-dimensional array, omitted ones are taken from new Salary object
+
+    Returns
+    -------
+    tuple
+        two arrays with salary before tax and after tax, their shape is (len(worktimes), len(rate), len(overtime),
+        len(bonus), len(standard_tax), len(overtime_tax)) (scalar parameter has length 1)
+
+    Raises
+    ------
+    TypeError
+        when unknown parameter is passed
+    """
+
+    unknown = set(parameters) - set(PARAMETERS)
+    if unknown:
+        raise TypeError(f'Unknown parameters: {", ".join(sorted(unknown))}')
+    default = Salary()
+    axes = [np.asarray(worktimes, dtype=np.float64).ravel()]
+    axes += [np.atleast_1d(np.asarray(parameters.get(name, getattr(default, name)), dtype=np.float64))
+             for name in PARAMETERS]
+    worktime, rate, overtime, bonus, standard_tax, overtime_tax = np.ix_(*axes)
+    hours = worktime / 60
+    extra = np.where(hours > overtime, hours - overtime, 0.0)
+    normal = (hours - extra) * rate
+    extra = extra * rate * bonus
+    gross = np.empty([len(axis) for axis in axes])
+    gross[...] = normal + extra
+    return gross, normal * (1 - standard_tax) + extra * (1 - overtime_tax)
@@ -0,0 +1,834 @@
+"""Storage Module
+
+It includes backends used by Document to read and save data of one year. Each backend provides the same methods:
+get_lines (lines from the end of current month segment backward), save_data (appends records and summaries),
+load_checkpoint and save_checkpoint (state of current month) and lock (context manager making sequence of these calls
+exclusive between processes - it uses advisory lock of file with lock extension next to document or database).
+
+    * TextStorage - default backend, plain text file "YYYY.txt" which can be easily read and changed manually. Lines are
+      read lazily in fixed-size blocks from the end of file so only its tail (current month) is loaded. State of month
+      is kept in checkpoint file next to document (e.g. "2020.txt.idx") together with size and modification time of
+      document. While they match the file is not read at all. Checkpoint keeps also table of month blocks (offset after
+      each separator with hash of bytes of block) and hash of last, unfinished block. When document was edited manually
+      blocks are compared from the beginning of file and lines are parsed again only from the first changed block (state
+      of month is empty after separator) or, when only new lines were appended, from previous end of file.
+    * SQLiteStorage - records and summaries stored in SQLite database indexed by date. Totals of each month and state of
+      current month are maintained in tables, so submit and month queries are index lookups. It can be exported to text
+      file with exactly the same layout as the one created by TextStorage.
+
+Durability of data appended by TextStorage (single submit as well as batch of Document.add_records) depends on mode:
+
+    * none - data are left in cache of operating system, power cut can lose the last records (default).
+    * fsync - file is synced to disk after each write, so submitted record survives power cut.
+    * group - group commit, files written by process are synced together when set number of records was written or set
+      number of milliseconds passed since the first unsynced write (and when process exits), e.g. for daemon or imports.
+
+Mode is passed to TextStorage (e.g. functools.partial(TextStorage, durability='fsync')) or set for whole application by
+environment variable WORKTIMESAVER_DURABILITY: "none", "fsync", "group" or "group:RECORDS:MILLISECONDS", e.g.
+"group:32:200" (default limits). Storages with the same limits of group share one GroupCommit object, so records of many
+submits are synced together. Incorrect value of environment variable is reported by warning and mode "none" is used.
+SQLiteStorage commits transactions with durability of SQLite settings.
+
+Modules used are: `atexit`, `contextlib`, `fcntl` (optional), `hashlib`, `json`, `locale`, `os`, `sqlite3`,
+`threading`, `warnings`, `instrumentation`, `parser`, `rates` and `salary`. It is required to provide them before
+running application.
+
+It contains functions:
+
+    * read_backwards - yields lines of opened binary file in reverse order reading it from the end in blocks.
+    * locked - context manager holding exclusive advisory lock of file.
+    * is_separator - checks if line of file separates months.
+    * find_unchanged - compares file with table of blocks from checkpoint and finds where it was changed.
+    * split_blocks - collects table of blocks forward from current position of file.
+    * fold_lines - sums time of records forward from current position of file collecting table of blocks.
+    * sync - flushes data of file to disk.
+    * replace_tail - replaces end of file atomically with rollback journal.
+    * recover - restores file from rollback journal left by interrupted replace_tail.
+    * parse_durability - converts text from environment variable to durability mode.
+    * default_durability - returns durability mode set by environment variable.
+
+License:
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import atexit
+from contextlib import contextmanager
+import hashlib
+import json
+import locale
+import os
+import threading
+import warnings
+from WorkTimeSaver.instrumentation import count
+from WorkTimeSaver.parser import parse_line
+from WorkTimeSaver.rates import RATES_FILE
+from WorkTimeSaver.salary import Salary
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+DURABILITY_MODES = ('none', 'fsync', 'group')
+GROUP_RECORDS = 32
+GROUP_DELAY = 200
+JOURNAL_EXTENSION = '.journal'
+
+
+def read_backwards(file, block_size=8192):
+    """Yields lines of file in reverse order
+
+    File is read from its end in blocks of fixed size so memory usage depends on length of lines consumed by caller, not
+    on size of file. Lines are decoded like in text mode: with default encoding and Windows line endings translated.
+
+    Parameters
+    ----------
+    file : io.BufferedReader
+        file opened in binary mode, it is closed when generator is exhausted or closed
+    block_size : int, optional
+        number of bytes read from file at once (default is 8192)
+
+    Yields
+    ------
+    str
+        file line with its line ending (last line of file may not have it)
+    """
+
+    encoding = locale.getpreferredencoding(False)
+    with file:
+        position = file.seek(0, os.SEEK_END)
+        head = b''
+        ending = b''
+        while position:
+            size = min(block_size, position)
+            position -= size
+            file.seek(position)
+            lines = (file.read(size) + head).split(b'\n')
+            head = lines.pop(0)
+            for line in reversed(lines):
+                if line or ending:
+                    yield (line + ending).decode(encoding).replace('\r\n', '\n')
+                ending = b'\n'
+        if head or ending:
+            yield (head + ending).decode(encoding).replace('\r\n', '\n')
+
+
+@contextmanager
+def locked(path):
+    """Holds exclusive advisory lock (fcntl.flock) of file with passed path, which is created when it doesn't exist
+
+    Lock is only respected by processes which use it as well. On systems without fcntl module (Windows) nothing is
+    locked. Lock file may be removed by its holder (e.g. archive removes it with year file), so file is locked again
+    when path doesn't point to locked file anymore.
+    """
+
+    while True:
+        with open(path, 'a') as f:
+            if fcntl:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                try:
+                    if os.stat(path).st_ino != os.fstat(f.fileno()).st_ino:
+                        continue
+                except FileNotFoundError:
+                    continue
+            yield
+            return
+
+
+def sync(path, directory=False):
+    """Flushes data of file to disk (os.fsync), also its directory when directory is True (needed for new file,
+    skipped on systems where directories can't be opened)"""
+
+    fd = os.open(path, os.O_RDWR)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+    count('Document.save_data', fsyncs=1)
+    if directory and os.name == 'posix':
+        fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        count('Document.save_data', fsyncs=1)
+
+
+def replace_tail(path, offset, data):
+    """Replaces bytes of file from offset to its end with data atomically
+
+    Previous tail is saved in rollback journal next to file (journal extension) and synced before file is changed,
+    journal is removed after new tail is synced. When process is interrupted in between, recover restores previous
+    tail, so file has either old or new content. Only tail of file is read and written.
+    """
+
+    journal = path + JOURNAL_EXTENSION
+    with open(path, 'r+b') as f:
+        f.seek(offset)
+        old = f.read()
+        with open(journal, 'wb') as j:
+            j.write(b'%d %d\n' % (offset, len(old)) + old)
+            j.flush()
+            os.fsync(j.fileno())
+        f.seek(offset)
+        f.write(data)
+        f.truncate()
+        f.flush()
+        os.fsync(f.fileno())
+    os.remove(journal)
+
+
+def recover(path):
+    """Restores tail of file saved in rollback journal by interrupted replace_tail and removes journal, returns True
+    when file was restored (incomplete journal means that file wasn't changed yet)"""
+
+    journal = path + JOURNAL_EXTENSION
+    try:
+        with open(journal, 'rb') as j:
+            header = j.readline().split()
+            old = j.read()
+    except FileNotFoundError:
+        return False
+    restored = len(header) == 2 and header[1].isdigit() and int(header[1]) == len(old)
+    if restored:
+        with open(path, 'r+b') as f:
+            f.seek(int(header[0]))
+            f.write(old)
+            f.truncate()
+            f.flush()
+            os.fsync(f.fileno())
+    os.remove(journal)
+    return restored
+
+
+class GroupCommit:
+    """
+    A class syncing files written by process together (group commit).
+
+    ...
+
+    Attributes
+    ----------
+    records : int
+        number of written records (objects) after which pending files are synced
+    delay : int
+        milliseconds after the first unsynced write after which pending files are synced
+    pending : dict
+        path of written file as key and tuple with number of unsynced records and flag of new file as value
+    lock : threading.Lock
+        lock held while pending files are changed
+    timer : threading.Timer
+        timer of delayed sync (None when nothing is pending)
+
+    Methods
+    -------
+    add(path, records, created=False)
+        registers write to file, syncs pending files when limit of records is reached
+    flush()
+        syncs all pending files
+    """
+
+    def __init__(self, records=GROUP_RECORDS, delay=GROUP_DELAY):
+        """
+        Parameters
+        ----------
+        records : int, optional
+            number of records after which files are synced (default is GROUP_RECORDS)
+        delay : int, optional
+            milliseconds after which files are synced (default is GROUP_DELAY)
+        """
+
+        self.records = records
+        self.delay = delay
+        self.pending = {}
+        self.lock = threading.Lock()
+        self.timer = None
+        atexit.register(self.flush)
+
+    def __repr__(self):
+        return f'<GroupCommit of {self.records} records or {self.delay} ms, {len(self.pending)} files pending>'
+
+    def add(self, path, records, created=False):
+        """Registers write of records to file (created by this write when created is True), files are synced at once
+        when limit of records is reached, otherwise sync is scheduled after delay"""
+
+        with self.lock:
+            unsynced, new = self.pending.get(path, (0, False))
+            self.pending[path] = unsynced + records, new or created
+            full = sum(unsynced for unsynced, _ in self.pending.values()) >= self.records
+            if not full and self.timer is None:
+                self.timer = threading.Timer(self.delay / 1000, self.flush)
+                self.timer.daemon = True
+                self.timer.start()
+        if full:
+            self.flush()
+
+    def flush(self):
+        """Syncs all pending files to disk"""
+
+        with self.lock:
+            if self.timer:
+                self.timer.cancel()
+                self.timer = None
+            pending, self.pending = self.pending, {}
+        for path, (_, created) in pending.items():
+            sync(path, created)
+
+
+def parse_durability(text):
+    """Returns durability mode ('none', 'fsync' or GroupCommit object) from text, e.g. 'fsync' or 'group:32:200'
+
+    The same GroupCommit object is returned for the same limits, so storages created for each submit sync together.
+
+    Raises
+    ------
+    ValueError
+        when text isn't correct mode
+    """
+
+    mode, *limits = text.strip().lower().split(':')
+    if mode not in DURABILITY_MODES or limits and (mode != 'group' or len(limits) != 2):
+        raise ValueError(f'Incorrect durability mode "{text}"')
+    if mode != 'group':
+        return mode
+    limits = tuple(map(int, limits)) or (GROUP_RECORDS, GROUP_DELAY)
+    with group_commits_lock:
+        if limits not in group_commits:
+            group_commits[limits] = GroupCommit(*limits)
+        return group_commits[limits]
+
+
+def default_durability():
+    """Returns durability mode set by environment variable WORKTIMESAVER_DURABILITY ('none' when it isn't set or is
+    incorrect, warning is issued then)"""
+
+    text = os.environ.get('WORKTIMESAVER_DURABILITY') or 'none'
+    try:
+        return parse_durability(text)
+    except ValueError as error:
+        warnings.warn(f'{error}, durability "none" is used', RuntimeWarning)
+        return 'none'
+
+
+group_commits = {}
+group_commits_lock = threading.Lock()
+
+
+def is_separator(line):
+    """Returns True when line (bytes) consists only of dashes, after such line state of month is empty"""
+
+    line = line.strip()
+    return bool(line) and not line.strip(b'-')
+
+
+def find_unchanged(file, checkpoint):
+    """Compares file with table of blocks saved in checkpoint to find where it was changed
+
+    Parameters
+    ----------
+    file : io.BufferedReader
+        document opened in binary mode at its beginning, its position is left at returned offset
+    checkpoint : dict
+        checkpoint of document with signature, state of month, blocks (list of offset after separator and hash of
+        bytes of block ending there) and tail (hash of bytes after last block)
+
+    Returns
+    -------
+    tuple
+        offset from which file has to be parsed, list of unchanged blocks, bytes between last unchanged block and offset
+        and state of month at offset (month, worktime and days)
+    """
+
+    position = 0
+    for index, (end, digest) in enumerate(checkpoint['blocks']):
+        if hashlib.blake2b(file.read(end - position), digest_size=8).hexdigest() != digest:
+            file.seek(position)
+            return position, checkpoint['blocks'][:index], b'', (0, 0, 0)
+        position = end
+    tail = file.read(checkpoint['size'] - position)
+    if len(tail) == checkpoint['size'] - position and tail.endswith(b'\n') and \
+            hashlib.blake2b(tail, digest_size=8).hexdigest() == checkpoint['tail']:
+        return checkpoint['size'], checkpoint['blocks'], tail, \
+            (checkpoint['month'], checkpoint['worktime'], checkpoint['days'])
+    file.seek(position)
+    return position, checkpoint['blocks'], b'', (0, 0, 0)
+
+
+def split_blocks(file, offset):
+    """Returns list of blocks (offset after separator and hash of block) from current position (offset) of file to its
+    end and hash of bytes after last block"""
+
+    blocks = []
+    block = hashlib.blake2b(digest_size=8)
+    for line in file:
+        offset += len(line)
+        block.update(line)
+        if is_separator(line):
+            blocks.append([offset, block.hexdigest()])
+            block = hashlib.blake2b(digest_size=8)
+    return blocks, block.hexdigest()
+
+
+def fold_lines(file, offset, head=b'', month=0, worktime=0, days=0):
+    """Sums time of records from current position of file to its end
+
+    It gives the same result as summing time backward from the end of file as long as record is met: time is added for
+    each record and cleared by any other line.
+
+    Parameters
+    ----------
+    file : io.BufferedReader
+        document opened in binary mode at offset
+    offset : int
+        current position of file
+    head : bytes, optional
+        bytes of unfinished block before offset (they are included in its hash)
+    month, worktime, days : int, optional
+        state of month at offset (default is empty state)
+
+    Returns
+    -------
+    tuple
+        list of new blocks, hash of bytes after last block and state of month at the end of file (month of last line,
+        worktime and days)
+    """
+
+    blocks = []
+    block = hashlib.blake2b(head, digest_size=8)
+    salary = Salary()
+    salary.worktime, salary.days_at_work = worktime, days
+    for line in file:
+        offset += len(line)
+        block.update(line)
+        entry = parse_line(line)
+        if entry.minutes:
+            salary.update_work(entry.minutes)
+        else:
+            salary.worktime = salary.days_at_work = 0
+        month = entry.month
+        if is_separator(line):
+            blocks.append([offset, block.hexdigest()])
+            block = hashlib.blake2b(digest_size=8)
+    return blocks, block.hexdigest(), (month, salary.worktime, salary.days_at_work)
+
+
+class TextStorage:
+    """
+    A class storing data of one year in text file.
+
+    ...
+
+    Attributes
+    ----------
+    document : str
+        path (year and txt extension in passed directory) of document where records are stored
+    rates_file : str
+        path to CSV file with exchange rates next to document (see rates)
+    checkpoint : str
+        name of file next to document (idx extension added) storing state of month from its last records
+    blocks : list
+        table of blocks of document (see find_unchanged) which matches its current content, None when it isn't known
+    parsed_from : int
+        offset from which document was parsed by last load_checkpoint (None when it wasn't parsed)
+    durability : str or GroupCommit
+        'none', 'fsync' or GroupCommit object syncing appended data (see module documentation)
+
+    Methods
+    -------
+    get_lines()
+        returns generator of file lines in reverse order
+    get_signature()
+        returns size and modification time of file
+    load_checkpoint()
+        returns state of month saved in checkpoint when it matches file
+    save_checkpoint(month, salary)
+        saves state of month with signature of file
+    save_data(*data)
+        appends file with data
+    lock()
+        holds exclusive lock of document (context manager)
+    """
+
+    def __init__(self, year, durability=None, directory=''):
+        """
+        Parameters
+        ----------
+        year : int
+            year of stored records
+        durability : str or GroupCommit, optional
+            'none', 'fsync', 'group' or 'group:RECORDS:MILLISECONDS' (group commit of module shared by storages with the
+            same limits, see parse_durability) or GroupCommit object, by default mode set by environment variable
+            WORKTIMESAVER_DURABILITY is used (see default_durability)
+        directory : str, optional
+            directory of document (default is current directory)
+
+        Raises
+        ------
+        ValueError
+            when durability mode is incorrect
+        """
+
+        self.document = os.path.join(directory, f'{year}.txt')
+        self.rates_file = os.path.join(directory, RATES_FILE)
+        self.checkpoint = self.document + '.idx'
+        self.blocks = None
+        self.parsed_from = None
+        if durability is None:
+            durability = default_durability()
+        elif not isinstance(durability, GroupCommit):
+            durability = parse_durability(durability)
+        self.durability = durability
+
+    def __repr__(self):
+        return f'<TextStorage "{self.document}">'
+
+    @contextmanager
+    def lock(self):
+        """Holds exclusive lock of document (file with lock extension next to it), document left by interrupted
+        replace_tail is recovered first"""
+
+        with locked(self.document + '.lock'):
+            recover(self.document)
+            yield
+
+    def get_lines(self):
+        """Opens file and returns generator reading its lines backward
+
+        Returns
+        -------
+        generator
+            file lines in reverse order read lazily from the end of file
+        False
+            when file doesn't exists
+        """
+
+        try:
+            return read_backwards(open(self.document, 'rb'))
+        except FileNotFoundError:
+            return False
+
+    def get_signature(self):
+        """Returns tuple with size and modification time (ns) of file or None when it doesn't exist"""
+
+        try:
+            stat = os.stat(self.document)
+        except FileNotFoundError:
+            return None
+        return stat.st_size, stat.st_mtime_ns
+
+    def load_checkpoint(self):
+        """Loads checkpoint of month state stored next to file
+
+        When file was changed after checkpoint had been saved, state is updated incrementally: only lines from the first
+        changed block (or appended lines) are parsed (see find_unchanged).
+
+        Returns
+        -------
+        dict
+            month of last record, worktime and days from Salary object
+        False
+            when checkpoint doesn't exist or is damaged, when file doesn't exist or is empty
+        """
+
+        self.parsed_from = None
+        try:
+            with open(self.checkpoint, 'r') as f:
+                checkpoint = json.load(f)
+            signature = self.get_signature()
+            if signature == (checkpoint['size'], checkpoint['mtime']):
+                self.blocks = checkpoint.get('blocks')
+                return checkpoint
+            if not signature or not signature[0] or 'blocks' not in checkpoint:
+                return False
+            with open(self.document, 'rb') as f:
+                offset, blocks, head, state = find_unchanged(f, checkpoint)
+                new_blocks, _, state = fold_lines(f, offset, head, *state)
+        except (OSError, ValueError, KeyError, TypeError):
+            return False
+        self.blocks = blocks + new_blocks
+        self.parsed_from = offset
+        return dict(zip(('month', 'worktime', 'days'), state))
+
+    def save_checkpoint(self, month, salary):
+        """Saves state of month (Salary object) with signature of file and table of its blocks to checkpoint
+
+        Only the last block of file (current month) is read to update table, whole file is read only when table isn't
+        known yet.
+
+        Parameters
+        ----------
+        month : int
+            month number from last file record
+        salary : salary.Salary
+            object with time summed from records of month
+        """
+
+        blocks = self.blocks or []
+        offset = blocks[-1][0] if blocks else 0
+        with open(self.document, 'rb') as f:
+            f.seek(offset)
+            new_blocks, tail = split_blocks(f, offset)
+            size, mtime = self.get_signature()
+        self.blocks = blocks + new_blocks
+        checkpoint = {'month': month, 'worktime': salary.worktime, 'days': salary.days_at_work,
+                      'size': size, 'mtime': mtime, 'blocks': self.blocks, 'tail': tail}
+        with open(self.checkpoint, 'w') as f:
+            f.write(json.dumps(checkpoint))
+
+    def save_data(self, *data):
+        """Appends file with new information (each object in separate line) using single write, then syncs it according
+        to durability mode
+
+        Parameters
+        ----------
+        data : object
+            objects (Record or Salary) with __str__ method allowing to print information to file
+        """
+
+        created = self.durability != 'none' and not os.path.exists(self.document)
+        with open(self.document, 'a+') as f:
+            f.write(''.join(f'{item}\n' for item in data))
+        if self.durability == 'fsync':
+            sync(self.document, created)
+        elif self.durability != 'none':
+            self.durability.add(self.document, len(data), created)
+
+
+class SQLiteStorage:
+    """
+    A class storing data of one year in SQLite database.
+
+    Table entries keeps records and summaries in order of adding (records with date and hours, summaries with worktime
+    and days), table months keeps totals of each month (worktime with deducted breaks and days) and table checkpoints
+    keeps state of current month for each year with id of its last summary.
+
+    ...
+
+    Attributes
+    ----------
+    year : int
+        year of stored records
+    database : str
+        path to database file
+    document : str
+        name of document with year stored in database
+    rates_file : str
+        path to CSV file with exchange rates next to database (see rates)
+
+    Methods
+    -------
+    connect()
+        returns connection to database with created tables
+    get_lines()
+        returns generator of lines after last summary in reverse order
+    load_checkpoint()
+        returns state of current month
+    save_checkpoint(month, salary)
+        saves state of current month
+    save_data(*data)
+        inserts records and summaries to database updating month totals
+    get_month(month)
+        returns Salary object with totals of passed month
+    get_records(first, last)
+        returns lines of records between passed dates
+    export(file)
+        writes all year entries to file in layout of text document
+    lock()
+        returns context manager holding exclusive lock of database
+    """
+
+    SCHEMA = '''
+        CREATE TABLE IF NOT EXISTS entries (id INTEGER PRIMARY KEY, year INTEGER NOT NULL, month INTEGER,
+            day INTEGER, start_time INTEGER, end_time INTEGER, worktime INTEGER, days INTEGER, line TEXT);
+        CREATE INDEX IF NOT EXISTS entries_date ON entries (year, month, day);
+        CREATE TABLE IF NOT EXISTS months (year INTEGER, month INTEGER, worktime INTEGER NOT NULL,
+            days INTEGER NOT NULL, PRIMARY KEY (year, month));
+        CREATE TABLE IF NOT EXISTS checkpoints (year INTEGER PRIMARY KEY, month INTEGER, worktime INTEGER NOT NULL
+            DEFAULT 0, days INTEGER NOT NULL DEFAULT 0, summary INTEGER NOT NULL DEFAULT 0);
+    '''
+
+    def __init__(self, year, database='WorkTimeSaver.db'):
+        """
+        Parameters
+        ----------
+        year : int
+            year of stored records
+        database : str, optional
+            path to database file (default is 'WorkTimeSaver.db')
+        """
+
+        self.year = year
+        self.database = database
+        self.document = f'{database}:{year}'
+        self.rates_file = os.path.join(os.path.dirname(database), RATES_FILE)
+
+    def __repr__(self):
+        return f'<SQLiteStorage "{self.document}">'
+
+    def lock(self):
+        """Returns context manager holding exclusive lock of database (file with lock extension next to it)"""
+
+        return locked(self.database + '.lock')
+
+    def connect(self):
+        """Returns connection to database (tables are created when they don't exist)
+
+        Module sqlite3 is imported only here, so it doesn't slow down start of application using text files.
+        """
+
+        import sqlite3
+        connection = sqlite3.connect(self.database)
+        connection.executescript(self.SCHEMA)
+        return connection
+
+    def get_lines(self):
+        """Returns generator of lines after last summary of year in reverse order or False when year has no entries"""
+
+        connection = self.connect()
+        try:
+            summary = connection.execute('SELECT summary FROM checkpoints WHERE year = ?', (self.year,)).fetchone()
+            if not summary:
+                return False
+            lines = connection.execute('SELECT line FROM entries WHERE id > ? AND year = ? ORDER BY id DESC',
+                                       (summary[0], self.year)).fetchall()
+        finally:
+            connection.close()
+        if summary[0]:
+            lines.append(('',))
+        return (line + '\n' for line, in lines)
+
+    def load_checkpoint(self):
+        """Returns dictionary with month, worktime and days of current month or False when year has no entries"""
+
+        connection = self.connect()
+        try:
+            checkpoint = connection.execute('SELECT month, worktime, days FROM checkpoints WHERE year = ?',
+                                            (self.year,)).fetchone()
+        finally:
+            connection.close()
+        if not checkpoint or checkpoint[0] is None:
+            return False
+        return dict(zip(('month', 'worktime', 'days'), checkpoint))
+
+    def save_checkpoint(self, month, salary):
+        """Saves state of current month
+
+        Parameters
+        ----------
+        month : int
+            month number from last record
+        salary : salary.Salary
+            object with time summed from records of month
+        """
+
+        connection = self.connect()
+        try:
+            with connection:
+                connection.execute('INSERT INTO checkpoints (year, month, worktime, days) VALUES (?, ?, ?, ?) '
+                                   'ON CONFLICT (year) DO UPDATE SET month = excluded.month, worktime = '
+                                   'excluded.worktime, days = excluded.days',
+                                   (self.year, month, salary.worktime, salary.days_at_work))
+        finally:
+            connection.close()
+
+    def save_data(self, *data):
+        """Inserts records and summaries (in single transaction) updating totals of months
+
+        Parameters
+        ----------
+        data : object
+            objects (Record or Salary) with __str__ method allowing to print information to file
+        """
+
+        connection = self.connect()
+        try:
+            with connection:
+                connection.execute('INSERT OR IGNORE INTO checkpoints (year) VALUES (?)', (self.year,))
+                for item in data:
+                    if isinstance(item, Salary):
+                        summary = connection.execute('INSERT INTO entries (year, worktime, days) VALUES (?, ?, ?)',
+                                                     (self.year, item.worktime, item.days_at_work)).lastrowid
+                        connection.execute('UPDATE checkpoints SET summary = ? WHERE year = ?', (summary, self.year))
+                        continue
+                    line = str(item)
+                    entry = parse_line(line)
+                    salary = Salary()
+                    salary.update_work(entry.minutes)
+                    connection.execute('INSERT INTO entries (year, month, day, start_time, end_time, line) '
+                                       'VALUES (?, ?, ?, ?, ?, ?)',
+                                       (self.year, entry.month, entry.day, entry.start, entry.end, line))
+                    connection.execute('INSERT INTO months VALUES (?, ?, ?, 1) ON CONFLICT (year, month) DO UPDATE '
+                                       'SET worktime = worktime + excluded.worktime, days = days + 1',
+                                       (self.year, entry.month, salary.worktime))
+        finally:
+            connection.close()
+
+    def get_month(self, month):
+        """Returns Salary object with worktime and days from all records of passed month"""
+
+        connection = self.connect()
+        try:
+            totals = connection.execute('SELECT worktime, days FROM months WHERE year = ? AND month = ?',
+                                        (self.year, month)).fetchone()
+        finally:
+            connection.close()
+        salary = Salary(self.rates_file)
+        salary.period = self.year, month
+        if totals:
+            salary.worktime, salary.days_at_work = totals
+        return salary
+
+    def get_records(self, first, last):
+        """Returns list of record lines between passed dates
+
+        Parameters
+        ----------
+        first : tuple
+            month and day of first record (inclusive)
+        last : tuple
+            month and day of last record (inclusive)
+
+        Returns
+        -------
+        list
+            lines of records (without line endings) ordered by date
+        """
+
+        connection = self.connect()
+        try:
+            lines = connection.execute('SELECT line FROM entries WHERE year = ? AND (month, day) BETWEEN (?, ?) AND '
+                                       '(?, ?) ORDER BY month, day, id', (self.year, *first, *last)).fetchall()
+        finally:
+            connection.close()
+        return [line for line, in lines]
+
+    def export(self, file):
+        """Writes all entries of year to file in layout of text document
+
+        Parameters
+        ----------
+        file : io.TextIOBase
+            file opened in text mode
+        """
+
+        connection = self.connect()
+        try:
+            entries = connection.execute('SELECT month, worktime, days, line FROM entries WHERE year = ? ORDER BY id',
+                                         (self.year,))
+            period = None
+            for month, worktime, days, line in entries:
+                if line is None:
+                    salary = Salary(self.rates_file)
+                    salary.worktime, salary.days_at_work, salary.period = worktime, days, period
+                    line = str(salary)
+                else:
+                    period = self.year, month
+                file.write(line + '\n')
+        finally:
+            connection.close()
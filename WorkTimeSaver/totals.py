@@ -0,0 +1,137 @@
+"""Totals Module
+
+Running totals of current month (days, hours, salary before and after tax) displayed by GUI. They are loaded once from
+year file (see Document.load_month, with checkpoint it doesn't read records) and then updated in memory from each added
+record, the same way as Document updates month when record is appended, so file isn't read again after submit. Preview
+returns totals as they would be after adding record without changing them or touching file.
+
+Modules used are: `copy`, `document`, `parser`, `salary` and `storage`. It is required to provide them before running
+application.
+
+License:
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import copy
+from WorkTimeSaver.document import Document, Record
+from WorkTimeSaver.parser import parse_line
+from WorkTimeSaver.salary import Salary
+from WorkTimeSaver.storage import TextStorage
+
+
+class MonthTotals:
+    """
+    A class with totals of month from last line of year file.
+
+    ...
+
+    Attributes
+    ----------
+    year : int
+        year of file
+    month : int
+        month number from last file line (None when file is empty, 0 when month wasn't found)
+    salary : salary.Salary
+        object with time of month
+
+    Methods
+    -------
+    from_file(date, storage=TextStorage)
+        returns totals loaded from year file of date
+    of_month(date)
+        returns totals of month of date
+    add(dates)
+        updates totals with new record, returns False when record belongs to other year file
+    preview(dates)
+        returns totals after adding record without changing these ones
+    """
+
+    def __init__(self, year, month=None, salary=None):
+        """
+        Parameters
+        ----------
+        year : int
+            year of file
+        month : int, optional
+            month number from last file line (default is None - empty file)
+        salary : salary.Salary, optional
+            object with time of month (default is new Salary object)
+        """
+
+        self.year = year
+        self.month = month
+        self.salary = Salary() if salary is None else salary
+        if month and not self.salary.period:
+            self.salary.period = year, month
+
+    def __repr__(self):
+        return f'<MonthTotals {self.month}.{self.year} with {self.salary.worktime} minutes>'
+
+    def __str__(self):
+        if not self.month:
+            return 'No records in this month yet.'
+        money = self.salary.calculate_salary()
+        currency = self.salary.get_currency()
+        return f'{self.month:02}.{self.year}: {self.salary.days_at_work} days, {self.salary.worktime // 60}:' \
+            f'{self.salary.worktime % 60:02}h, {sum(money):.2f}{currency} ({self.salary.deduct_tax(money):.2f}' \
+            f'{currency} after tax)'
+
+    @classmethod
+    def from_file(cls, date, storage=TextStorage):
+        """Returns totals of month from last line of year file (of passed datetime), storage is backend class (see
+        Document)"""
+
+        document = Document(date, storage=storage)
+        with document.storage.lock():
+            month = document.load_month()
+        return cls(document.year, month, document.salary)
+
+    def of_month(self, date):
+        """Returns totals of month of passed datetime: these ones when it is month from last line of file, otherwise
+        empty totals (record of other month starts it again, see add)"""
+
+        if (date.year, date.month) == (self.year, self.month):
+            return self
+        return MonthTotals(date.year, 0, Salary(self.salary.rates_file))
+
+    def add(self, dates):
+        """Updates totals with record like Document.append_record does with month in file (new month starts with blank
+        Salary object, record without time clears time of month)
+
+        Parameters
+        ----------
+        dates : tuple
+            datetime objects with beginning and end of work (see document.parse_dates)
+
+        Returns
+        -------
+        bool
+            True when totals were updated, False when record belongs to other year (totals have to be loaded again)
+        """
+
+        start = dates[0]
+        if start.year != self.year:
+            return False
+        if start.month != self.month:
+            self.month = start.month
+            self.salary = Salary(self.salary.rates_file)
+            self.salary.period = self.year, self.month
+        minutes = parse_line(str(Record(*dates))).minutes
+        if minutes:
+            self.salary.update_work(minutes)
+        else:
+            self.salary.worktime = self.salary.days_at_work = 0
+        return True
+
+    def preview(self, dates):
+        """Returns new MonthTotals object with totals after adding record (see add), None when record belongs to other
+        year"""
+
+        totals = MonthTotals(self.year, self.month, copy.copy(self.salary))
+        return totals if totals.add(dates) else None
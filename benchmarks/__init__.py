@@ -0,0 +1,6 @@
+"""Benchmarks
+
+Scripts measuring performance of hot paths of WorkTimeSaver. Run them from repository root, e.g.:
+
+    python -m benchmarks.bench_parser
+"""
@@ -0,0 +1,98 @@
+"""Asynchronous processing load test
+
+Many employees (each with year file in own directory) submit records at the same time. Records per second are compared
+for synchronous path (Document.process_file called one after another, like request handler blocking event loop would
+do) and AsyncDocument with executors of different size (all records submitted at once with asyncio.gather). Submits to
+the same year file are serialized, other files are written in parallel, so gain comes from blocking I/O (mainly fsync,
+see --durability) overlapping between files. Each year file is checked against the one written synchronously.
+
+    python -m benchmarks.bench_async [--employees 100] [--records 20] [--workers 1 4 8 16] [--durability fsync]
+"""
+
+import argparse
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from functools import partial
+import os
+import tempfile
+from time import perf_counter
+from WorkTimeSaver.aio import AsyncDocument
+from WorkTimeSaver.document import Document
+from WorkTimeSaver.storage import TextStorage
+
+
+def record_dates(index):
+    """Returns dates of record number index of employee (month changes every 28 records)"""
+
+    return datetime(2020, index // 28 % 12 + 1, index % 28 + 1, 8, 0), datetime(1900, 1, 1, 16, 30)
+
+
+def submits(directory, employees, records, durability):
+    """Returns list of tuples with dates and storage of each submit (records of employees interleaved)"""
+
+    storages = []
+    for employee in range(employees):
+        os.makedirs(os.path.join(directory, str(employee)))
+        storages.append(partial(TextStorage, durability=durability, directory=os.path.join(directory, str(employee))))
+    return [(record_dates(index), storage) for index in range(records) for storage in storages]
+
+
+def measure_sync(directory, employees, records, durability):
+    """Submits records one after another, returns records per second"""
+
+    start = perf_counter()
+    for dates, storage in submits(directory, employees, records, durability):
+        Document(*dates, storage=storage).process_file()
+    return employees * records / (perf_counter() - start)
+
+
+async def submit_all(directory, employees, records, durability, workers):
+    """Submits all records at once with AsyncDocument and executor with passed number of workers"""
+
+    with ThreadPoolExecutor(workers) as executor:
+        await asyncio.gather(*(AsyncDocument(*dates, storage=storage, executor=executor).process_file()
+                               for dates, storage in submits(directory, employees, records, durability)))
+
+
+def measure_async(directory, employees, records, durability, workers):
+    """Submits records with AsyncDocument, returns records per second"""
+
+    start = perf_counter()
+    asyncio.run(submit_all(directory, employees, records, durability, workers))
+    return employees * records / (perf_counter() - start)
+
+
+def compare(directory, expected, employees):
+    """Returns number of year files of employees in directory which differ from ones in expected directory"""
+
+    differences = 0
+    for employee in range(employees):
+        with open(os.path.join(directory, str(employee), '2020.txt'), 'rb') as f, \
+                open(os.path.join(expected, str(employee), '2020.txt'), 'rb') as e:
+            differences += f.read() != e.read()
+    return differences
+
+
+def main():
+    arguments = argparse.ArgumentParser(description='Compare records per second of synchronous and async submits.')
+    arguments.add_argument('--employees', type=int, default=100)
+    arguments.add_argument('--records', type=int, default=20, help='number of records submitted by each employee')
+    arguments.add_argument('--workers', type=int, nargs='+', default=[1, 4, 8, 16], help='sizes of executor')
+    arguments.add_argument('--durability', default='fsync', help='durability mode of TextStorage')
+    arguments.add_argument('--directory', help='directory where temporary files are written (default is system one)')
+    options = arguments.parse_args()
+    size = options.employees, options.records, options.durability
+    with tempfile.TemporaryDirectory(dir=options.directory) as directory:
+        expected = os.path.join(directory, 'sync')
+        print(f'{"path":<16}{"records/s":>12}')
+        print(f'{"sync":<16}{measure_sync(expected, *size):>12,.0f}')
+        for workers in options.workers:
+            target = os.path.join(directory, f'async{workers}')
+            rate = measure_async(target, *size, workers)
+            differences = compare(target, expected, options.employees)
+            print(f'{f"async {workers}":<16}{rate:>12,.0f}' + (f'  {differences} files differ' if differences else ''))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""Durability benchmark
+
+Compares number of records saved per second with each durability mode of TextStorage (none, fsync per write and group
+commit) when records are submitted one by one (Document.process_file) and in batches (Document.add_records). Files are
+written to temporary directory, so results depend on file system where it is placed (--directory).
+
+    python -m benchmarks.bench_durability [--records 500] [--batch 50] [--directory DIR]
+"""
+
+import argparse
+from datetime import datetime
+from functools import partial
+import os
+import tempfile
+from time import perf_counter
+from WorkTimeSaver.document import Document
+from WorkTimeSaver.storage import GroupCommit, TextStorage
+
+MODES = (('none', lambda: 'none'), ('fsync', lambda: 'fsync'), ('group 32/200ms', lambda: GroupCommit(32, 200)))
+
+
+def record_dates(index):
+    """Returns dates of record number index (month changes every 28 records)"""
+
+    return datetime(2020, index // 28 % 12 + 1, index % 28 + 1, 8, 0), datetime(1900, 1, 1, 16, 30)
+
+
+def measure(durability, records, batch=0):
+    """Saves records to new year file in current directory with durability mode, returns records per second
+
+    Parameters
+    ----------
+    durability : str or GroupCommit
+        durability mode of TextStorage
+    records : int
+        number of saved records
+    batch : int, optional
+        number of records saved by single Document.add_records call, 0 when they are submitted one by one (default)
+    """
+
+    storage = partial(TextStorage, durability=durability)
+    dates = [record_dates(index) for index in range(records)]
+    start = perf_counter()
+    if batch:
+        for first in range(0, records, batch):
+            Document.add_records(dates[first:first + batch], storage)
+    else:
+        for record in dates:
+            Document(*record, storage=storage).process_file()
+    if isinstance(durability, GroupCommit):
+        durability.flush()
+    elapsed = perf_counter() - start
+    for name in ('2020.txt', '2020.txt.idx'):
+        os.remove(name)
+    return records / elapsed
+
+
+def main():
+    arguments = argparse.ArgumentParser(description='Measure records saved per second with each durability mode.')
+    arguments.add_argument('--records', type=int, default=500)
+    arguments.add_argument('--batch', type=int, default=50, help='number of records in batch of add_records')
+    arguments.add_argument('--directory', help='directory where temporary files are written (default is system one)')
+    options = arguments.parse_args()
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(dir=options.directory) as directory:
+        os.chdir(directory)
+        try:
+            measure('none', 28)
+            print(f'{"mode":<16}{"single records/s":>18}{"batch records/s":>18}')
+            for name, durability in MODES:
+                single = measure(durability(), options.records)
+                batch = measure(durability(), options.records, options.batch)
+                print(f'{name:<16}{single:>18,.0f}{batch:>18,.0f}')
+        finally:
+            os.chdir(cwd)
+
+
+if __name__ == '__main__':
+    main()
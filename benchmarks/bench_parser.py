@@ -0,0 +1,59 @@
+"""Parser benchmark
+
+Compares number of lines parsed per second by parser module with regex searches previously used by Document.
+"""
+
+import re
+from timeit import repeat
+from WorkTimeSaver.parser import parse_line
+
+LINES = [
+    '15.02\t\t08:00-18:25\t10:25h\n',
+    '16.02\t\t07:30-16:00\t08:30h\n',
+    '15.02\t\t8:00-16:00\t08:00h  sick leave\n',
+    '26\t\t\t\t288:00h\n',
+    '\t\t\t\t87687.50NOK (35951.88PLN)\n',
+    '\n',
+    '------------------------------------------------------------------------------------\n',
+] * 1000
+RECORDS = LINES[:2] * 3500
+
+
+def get_info(pattern, line):
+    try:
+        return re.search(pattern, line).group(1)
+    except AttributeError:
+        return False
+
+
+def regex_path(lines):
+    for line in lines:
+        result = get_info("\t(..:..)h", line)
+        if result:
+            time = result.split(":")
+            int(time[0]) * 60 + int(time[1])
+        result = get_info(".(..)\t", line)
+        if result:
+            try:
+                int(result)
+            except ValueError:
+                pass
+
+
+def parser_path(lines):
+    for line in lines:
+        parse_line(line)
+
+
+def main():
+    for title, lines in (('mixed lines', LINES), ('records only', RECORDS)):
+        print(title)
+        data = (('regex (str)', regex_path, lines), ('parser (str)', parser_path, lines),
+                ('parser (bytes)', parser_path, [line.encode() for line in lines]))
+        for name, function, sample in data:
+            best = min(repeat(lambda: function(sample), number=5, repeat=5)) / 5
+            print(f'    {name:<16}{len(sample) / best:>14,.0f} lines/s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+"""Startup benchmark
+
+Compares time of starting command line interface (which doesn't import tkinter) with import of GUI module. Each command
+is run in new interpreter several times and the best time is printed.
+
+    python -m benchmarks.bench_startup
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+from time import perf_counter
+
+COMMANDS = (
+    ('interpreter only', ['-c', 'pass']),
+    ('cli add', ['-m', 'WorkTimeSaver', 'add', '26.02.20', '8:00', '16:30']),
+    ('cli summary', ['-m', 'WorkTimeSaver', 'summary', '--year', '2020']),
+    ('gui import', ['-c', 'import WorkTimeSaver.gui']),
+    ('gui window', ['-c', 'from WorkTimeSaver.gui import Gui; Gui("Work Time Saver", "450x200").update()']),
+)
+
+
+def measure(arguments, directory, repeat=10):
+    """Returns the best time (seconds) of running python with passed arguments in directory, None when it failed"""
+
+    environment = dict(os.environ, PYTHONPATH=os.getcwd())
+    times = []
+    for _ in range(repeat):
+        start = perf_counter()
+        result = subprocess.run([sys.executable, *arguments], cwd=directory, env=environment,
+                                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        if result.returncode:
+            return None
+        times.append(perf_counter() - start)
+    return min(times)
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        for name, arguments in COMMANDS:
+            elapsed = measure(arguments, directory)
+            print(f'{name:<20}' + (f'{elapsed * 1000:>8.1f}ms' if elapsed else '  failed (no display?)'))
+
+
+if __name__ == '__main__':
+    main()
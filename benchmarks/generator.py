@@ -0,0 +1,71 @@
+"""Synthetic year files
+
+Writes year files in the same layout as Document does - records of work days, month summaries and separators - so hot
+paths can be measured on files of any size. Number of months can exceed 12 to emulate file with many years of history
+(month numbers start again from January). Manual notes (lines which aren't records) can be mixed between records.
+
+    python -m benchmarks.generator FILE [--months 12] [--days 22] [--noise 0.05] [--seed 0]
+"""
+
+import argparse
+from datetime import datetime
+import random
+from WorkTimeSaver.document import Record
+from WorkTimeSaver.salary import Salary
+
+NOTES = ('sick leave', 'vacation', 'training in office', '15.02 business trip', 'overtime approved by manager')
+
+
+def generate_lines(months=12, days=22, noise=0.0, seed=0):
+    """Yields lines (with new line characters) of synthetic year file
+
+    Parameters
+    ----------
+    months : int, optional
+        number of months in file, month numbers repeat after December (default is 12)
+    days : int, optional
+        number of work days in each month, at most 28 (default is 22)
+    noise : float, optional
+        probability of manual note placed before record (default is 0.0)
+    seed : int, optional
+        seed of random generator, the same arguments always give the same lines (default is 0)
+    """
+
+    generator = random.Random(seed)
+    for index in range(months):
+        salary = Salary()
+        for day in range(1, days + 1):
+            if generator.random() < noise:
+                salary = Salary()
+                yield generator.choice(NOTES) + '\n'
+            start = datetime(2000, index % 12 + 1, day, generator.randint(6, 9), generator.choice((0, 15, 30, 45)))
+            end = datetime(1900, 1, 1, generator.randint(14, 23), generator.randrange(60))
+            record = Record(start, end)
+            salary.update_work((record.end - record.start).seconds // 60)
+            yield f'{record}\n'
+        if index < months - 1:
+            yield f'{salary}\n'
+
+
+def generate(path, months=12, days=22, noise=0.0, seed=0):
+    """Writes synthetic year file to path (see generate_lines for parameters), returns its size in bytes"""
+
+    with open(path, 'w') as f:
+        f.writelines(generate_lines(months, days, noise, seed))
+        return f.tell()
+
+
+def main():
+    arguments = argparse.ArgumentParser(description='Write synthetic year file.')
+    arguments.add_argument('file', help='path of year file, e.g. 2000.txt')
+    arguments.add_argument('--months', type=int, default=12, help='number of months (more than 12 for many years)')
+    arguments.add_argument('--days', type=int, default=22, help='number of work days in month (at most 28)')
+    arguments.add_argument('--noise', type=float, default=0.05, help='probability of manual note before record')
+    arguments.add_argument('--seed', type=int, default=0)
+    options = arguments.parse_args()
+    size = generate(options.file, options.months, options.days, options.noise, options.seed)
+    print(f'{options.file}: {size:,} bytes')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,154 @@
+"""Hot path benchmark
+
+Generates synthetic year files of growing size (see generator) in temporary directory and measures functions used on
+each submit: Document.process_file (without checkpoint, so tail of file is read, and with valid checkpoint),
+Document.sum_month over lines read from end of file, Document.get_minutes and Document.get_month for every file line and
+Salary.sum_up. For each of them the best time of few runs, throughput and peak memory allocated during single run
+(measured by tracemalloc in separate run, so tracing doesn't affect time) are reported. Results can be saved as JSON and
+compared with results of previous run.
+
+    python -m benchmarks.run [--sizes 1 12 120 600] [--days 22] [--noise 0.05] [--repeat 5] [--output FILE]
+                             [--compare FILE]
+"""
+
+import argparse
+from datetime import datetime
+import json
+import os
+import platform
+import shutil
+import tempfile
+from time import perf_counter
+import tracemalloc
+from benchmarks.generator import generate
+from WorkTimeSaver.document import Document
+from WorkTimeSaver.salary import Salary
+
+YEAR = 2000
+SUM_UP_CALLS = 1000
+
+
+def measure(function, setup=None, repeat=5):
+    """Calls function repeat times (after setup, which isn't measured), returns best time and peak memory in bytes"""
+
+    times = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = perf_counter()
+        function()
+        times.append(perf_counter() - start)
+    if setup:
+        setup()
+    tracemalloc.start()
+    try:
+        function()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return min(times), peak
+
+
+def benchmark_size(months, days=22, noise=0.05, repeat=5):
+    """Measures hot paths on year file with set number of months, returns list of results (dictionaries)
+
+    Works in current directory, where year file and its copy are created.
+    """
+
+    document = f'{YEAR}.txt'
+    size = generate('pristine.txt', months, days, noise)
+    with open('pristine.txt', 'r') as f:
+        lines = f.readlines()
+    dates = datetime(YEAR, (months - 1) % 12 + 1, 28, 8, 0), datetime(1900, 1, 1, 16, 0)
+
+    def restore(checkpoint=False):
+        shutil.copyfile('pristine.txt', document)
+        if os.path.exists(document + '.idx'):
+            os.remove(document + '.idx')
+        if checkpoint:
+            loaded = Document(dates[0])
+            loaded.storage.save_checkpoint(loaded.load_month(), loaded.salary)
+
+    def sum_month():
+        reader = Document(dates[0])
+        reader.sum_month(reader.get_lines())
+
+    def for_lines(method):
+        def function():
+            for line in lines:
+                method(line)
+        return function
+
+    salary = Salary()
+    salary.worktime, salary.days_at_work = 10000, 22
+    restore()
+    summed = Document(dates[0])
+    summed.sum_month(summed.get_lines())
+    reader = Document(dates[0])
+    cases = (
+        ('process_file (no checkpoint)', lambda: Document(*dates).process_file(), restore, 1),
+        ('process_file (checkpoint)', lambda: Document(*dates).process_file(), lambda: restore(True), 1),
+        ('sum_month', sum_month, restore, summed.salary.days_at_work),
+        ('get_minutes', for_lines(reader.get_minutes), None, len(lines)),
+        ('get_month', for_lines(reader.get_month), None, len(lines)),
+        ('Salary.sum_up', lambda: [salary.sum_up() for _ in range(SUM_UP_CALLS)], None, SUM_UP_CALLS),
+    )
+    results = []
+    for name, function, setup, operations in cases:
+        seconds, peak = measure(function, setup, repeat)
+        results.append({'name': name, 'months': months, 'lines': len(lines), 'bytes': size, 'operations': operations,
+                        'seconds': seconds, 'per_second': operations / seconds if seconds else None,
+                        'peak_memory': peak})
+    return results
+
+
+def run(sizes=(1, 12, 120, 600), days=22, noise=0.05, repeat=5):
+    """Runs benchmark for each size (number of months in file) in temporary directory, returns report dictionary"""
+
+    cwd = os.getcwd()
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        try:
+            for months in sizes:
+                results.extend(benchmark_size(months, days, noise, repeat))
+        finally:
+            os.chdir(cwd)
+    return {'python': platform.python_version(), 'platform': platform.platform(),
+            'date': datetime.now().isoformat(timespec='seconds'), 'days': days, 'noise': noise, 'results': results}
+
+
+def compare(results, previous):
+    """Returns dictionary with ratio of current to previous time for each (name, months) present in both results"""
+
+    times = {(result['name'], result['months']): result['seconds'] for result in previous}
+    return {(result['name'], result['months']): result['seconds'] / times[result['name'], result['months']]
+            for result in results if times.get((result['name'], result['months']))}
+
+
+def main():
+    arguments = argparse.ArgumentParser(description='Measure hot paths of Document on synthetic year files.')
+    arguments.add_argument('--sizes', type=int, nargs='+', default=[1, 12, 120, 600], help='numbers of months in file')
+    arguments.add_argument('--days', type=int, default=22, help='number of work days in month (at most 28)')
+    arguments.add_argument('--noise', type=float, default=0.05, help='probability of manual note before record')
+    arguments.add_argument('--repeat', type=int, default=5, help='number of measured runs (the best is reported)')
+    arguments.add_argument('--output', help='JSON file where results are saved')
+    arguments.add_argument('--compare', help='JSON file with results of previous run')
+    options = arguments.parse_args()
+    report = run(options.sizes, options.days, options.noise, options.repeat)
+    ratios = {}
+    if options.compare:
+        with open(options.compare, 'r') as f:
+            ratios = compare(report['results'], json.load(f)['results'])
+    print(f'{"case":<30}{"months":>8}{"bytes":>12}{"ops/s":>14}{"peak KiB":>10}{"vs previous":>13}')
+    for result in report['results']:
+        ratio = ratios.get((result['name'], result['months']))
+        print(f'{result["name"]:<30}{result["months"]:>8}{result["bytes"]:>12,}{result["per_second"]:>14,.0f}'
+              f'{result["peak_memory"] / 1024:>10,.1f}{f"{ratio:.2f}x" if ratio else "":>13}')
+    if options.output:
+        with open(options.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
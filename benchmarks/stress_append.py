@@ -0,0 +1,96 @@
+"""Concurrent append stress test
+
+Many processes submit records to one year file at the same time. Afterwards file is checked: each record has to be
+present exactly once and the whole file has to be identical to the one created by submitting the same records one after
+another in the order they were saved (so no summary is missing, duplicated or wrong). Throughput is printed.
+
+    python -m benchmarks.stress_append [--processes 8] [--records 200]
+"""
+
+import argparse
+from datetime import datetime
+from multiprocessing import Pool
+import os
+import tempfile
+from time import perf_counter
+from WorkTimeSaver.document import Document
+from WorkTimeSaver.parser import RECORD, parse_file
+
+YEAR = 2020
+
+
+def record_dates(worker, index):
+    """Returns unique dates of record number index submitted by worker (month changes every 28 records)"""
+
+    month, day, minute = index // 28 % 12 + 1, index % 28 + 1, (worker // 24 + index // 336) % 60
+    return datetime(YEAR, month, day, worker % 24, minute), datetime(1900, 1, 1, 23, 59)
+
+
+def submit(arguments):
+    """Submits records of one worker to year file in passed directory, returns time it took"""
+
+    directory, worker, count = arguments
+    os.chdir(directory)
+    start = perf_counter()
+    for index in range(count):
+        Document(*record_dates(worker, index)).process_file()
+    return perf_counter() - start
+
+
+def verify(directory, expected):
+    """Checks year file from directory, returns list of problems (empty when file is correct)
+
+    Parameters
+    ----------
+    directory : str
+        directory with year file
+    expected : set
+        tuples with dates of all submitted records
+    """
+
+    path = os.path.join(directory, f'{YEAR}.txt')
+    with open(path, 'rb') as f:
+        records = [entry for entry in parse_file(f) if entry.kind == RECORD]
+    saved = [(datetime(YEAR, entry.month, entry.day, entry.start // 60, entry.start % 60),
+              datetime(1900, 1, 1, entry.end // 60, entry.end % 60)) for entry in records]
+    problems = []
+    if len(saved) != len(set(saved)):
+        problems.append(f'{len(saved) - len(set(saved))} duplicated records')
+    if set(saved) != expected:
+        problems.append(f'{len(expected - set(saved))} lost records, {len(set(saved) - expected)} unknown records')
+    with tempfile.TemporaryDirectory() as replay:
+        cwd = os.getcwd()
+        os.chdir(replay)
+        try:
+            for dates in saved:
+                Document(*dates).process_file()
+            with open(f'{YEAR}.txt', 'rb') as f:
+                sequential = f.read()
+        finally:
+            os.chdir(cwd)
+    with open(path, 'rb') as f:
+        if f.read() != sequential:
+            problems.append('file differs from sequential submits (summaries are wrong)')
+    return problems
+
+
+def main():
+    arguments = argparse.ArgumentParser(description='Submit records to one year file from many processes.')
+    arguments.add_argument('--processes', type=int, default=8)
+    arguments.add_argument('--records', type=int, default=200, help='number of records submitted by each process')
+    options = arguments.parse_args()
+    with tempfile.TemporaryDirectory() as directory:
+        start = perf_counter()
+        with Pool(options.processes) as pool:
+            pool.map(submit, [(directory, worker, options.records) for worker in range(options.processes)])
+        elapsed = perf_counter() - start
+        total = options.processes * options.records
+        expected = {record_dates(worker, index) for worker in range(options.processes)
+                    for index in range(options.records)}
+        problems = verify(directory, expected)
+    print(f'{total} records from {options.processes} processes in {elapsed:.2f}s ({total / elapsed:,.0f} records/s)')
+    print('\n'.join(problems) if problems else 'file is consistent')
+
+
+if __name__ == '__main__':
+    main()
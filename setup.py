@@ -22,5 +22,8 @@ setup(
                  'Programming Language :: Python'
                  ],
     packages=['WorkTimeSaver'],
-    entry_points={'console_scripts': 'WorkTimeSaver=WorkTimeSaver.__main__:main'}
+    python_requires='>=3.9',
+    extras_require={'simulation': ['numpy']},
+    entry_points={'console_scripts': ['WorkTimeSaver=WorkTimeSaver.__main__:main',
+                                      'worktimesaver=WorkTimeSaver.cli:main']}
 )
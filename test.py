@@ -1,8 +1,43 @@
 import unittest
 from WorkTimeSaver.salary import Salary
-from WorkTimeSaver.document import Record, Document
+from WorkTimeSaver.document import Record, Document, MonthCache, parse_dates
+from WorkTimeSaver.storage import SQLiteStorage, read_backwards
+from WorkTimeSaver.parser import parse_line, parse_buffer
+from WorkTimeSaver import payroll
+from WorkTimeSaver.repair import copy_rebuilt, rebuild_summaries
+from WorkTimeSaver import storage
+from WorkTimeSaver import cli
+from WorkTimeSaver import instrumentation
+from WorkTimeSaver import rates
+from WorkTimeSaver import query
+from WorkTimeSaver import daemon
+from WorkTimeSaver import export
+from WorkTimeSaver import correction
+from WorkTimeSaver import archive
+from WorkTimeSaver import mirror
+from WorkTimeSaver import aio
+from WorkTimeSaver.totals import MonthTotals
+try:
+    from WorkTimeSaver import simulation
+except ImportError:
+    simulation = None
+from benchmarks import generator, run, stress_append
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from os import remove
+from functools import partial
+from contextlib import redirect_stdout
+from io import BytesIO, StringIO
+import asyncio
+import gzip
+import json
+from multiprocessing import Pool
+import os
+import subprocess
+import sys
+import socket
+import tempfile
+import threading
+from os import remove, stat, utime
 
 
 class TestSalary(unittest.TestCase):
@@ -57,6 +92,15 @@ class TestSalary(unittest.TestCase):
 
 class TestHandler(unittest.TestCase):
 
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.directory = tempfile.TemporaryDirectory()
+        os.chdir(self.directory.name)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.directory.cleanup()
+
     def test_new_record(self):
         start = datetime(2020, 2, 15, 8, 0)
         end = datetime.strptime('18:25', '%H:%M')
@@ -126,9 +170,768 @@ class TestHandler(unittest.TestCase):
 
         with open('2019.txt', 'r') as f:
             content = f.readlines()
-        remove('2019.txt')
         self.assertEqual(content, lines)
 
+    def test_manual_edit(self):
+        for day in ('01', '02'):
+            Document(datetime(2021, 3, int(day), 8, 0), datetime(1900, 1, 1, 16, 0)).process_file()
+        with open('2021.txt', 'r') as f:
+            content = f.read().replace('02.03\t\t08:00-16:00\t08:00h', '02.03\t\t08:00-18:00\t10:00h')
+        with open('2021.txt', 'w') as f:
+            f.write(content)
+        edited = stat('2021.txt')
+        utime('2021.txt', ns=(edited.st_atime_ns, edited.st_mtime_ns + 10 ** 9))
+        Document(datetime(2021, 4, 1, 8, 0), datetime(1900, 1, 1, 16, 0)).process_file()
+        with open('2021.txt', 'r') as f:
+            summary = f.readlines()[2]
+        self.assertEqual(summary, '2\t\t\t\t17:00h\n')
+
+    def test_incremental_parse(self):
+        def edit(old, new):
+            with open('2018.txt', 'r') as f:
+                content = f.read()
+            with open('2018.txt', 'w') as f:
+                f.write(content.replace(old, new) if old else content + new)
+            edited = stat('2018.txt')
+            utime('2018.txt', ns=(edited.st_atime_ns, edited.st_mtime_ns + 10 ** 9))
+            document = Document(datetime(2018, 1, 1))
+            month = document.load_month()
+            expected = Document(datetime(2018, 1, 1))
+            expected.storage.load_checkpoint = lambda: False
+            return document.storage, (month, document.salary.worktime, document.salary.days_at_work), \
+                (expected.load_month(), expected.salary.worktime, expected.salary.days_at_work)
+
+        Document.add_records([(datetime(2018, month, day, 8, 0), datetime(1900, 1, 1, 8 + day, 0))
+                              for month in (1, 2, 3) for day in (1, 2, 3)])
+        size = stat('2018.txt').st_size
+        backend, state, expected = edit('', '04.03\t\t08:00-12:00\t04:00h\n')
+        self.assertEqual((backend.parsed_from, state), (size, expected))
+        self.assertEqual(state, (3, 600, 4))
+        backend, state, expected = edit('03.03\t\t08:00-11:00', '03.03\t\t08:00-12:00')
+        self.assertEqual((backend.parsed_from, state), (backend.blocks[-1][0], expected))
+        backend, state, expected = edit('02.02\t\t08:00-10:00\t02:00h\n', '')
+        self.assertEqual((backend.parsed_from, state), (backend.blocks[0][0], expected))
+        backend, state, expected = edit('01.01\t\t08:00-09:00\t01:00h\n', '01.01\t\t08:00-09:00\t01:00h\nnote\n')
+        self.assertEqual((backend.parsed_from, state), (0, expected))
+        Document(datetime(2018, 3, 5, 8, 0), datetime(1900, 1, 1, 9, 0)).process_file()
+        self.assertEqual(Document(datetime(2018, 1, 1)).storage.load_checkpoint()['worktime'], 660)
+
+    def test_records_batch(self):
+        dates = [(datetime(2018, month, day, 8, 0), datetime(1900, 1, 1, 8 + day % 9, 15)) for month in (1, 2, 3)
+                 for day in range(1, 29, 3)]
+        Document.add_records(dates[:2])
+        Document.add_records(reversed(dates[2:]))
+        with open('2018.txt', 'r') as f, open('2018.txt.idx', 'r') as idx:
+            batch = f.read(), idx.read().split(', "size"')[0]
+        remove('2018.txt')
+        remove('2018.txt.idx')
+        for record in dates:
+            Document(*record).process_file()
+        with open('2018.txt', 'r') as f, open('2018.txt.idx', 'r') as idx:
+            single = f.read(), idx.read().split(', "size"')[0]
+        self.assertEqual(batch, single)
+
+    def test_record_without_time(self):
+        dates = [(datetime(2018, 3, day, 8, 0), datetime(1900, 1, 1, hour, 0))
+                 for day, hour in ((1, 16), (2, 8), (3, 16))]
+        for record in dates:
+            Document(*record).process_file()
+        Document.add_records([(datetime(2019, 3, 1, 8, 0), datetime(1900, 1, 1, 16, 0))] + dates[1:])
+        for year in (2018, 2019):
+            checkpoint, parsed = Document(datetime(year, 1, 1)), Document(datetime(year, 1, 1))
+            self.assertEqual(checkpoint.load_month(), 3)
+            remove(f'{year}.txt.idx')
+            self.assertEqual(parsed.load_month(), 3)
+            for salary in (checkpoint.salary, parsed.salary):
+                self.assertEqual((salary.worktime, salary.days_at_work), (450, 1))
+
+    def test_month_totals(self):
+        totals = MonthTotals.from_file(datetime(2018, 1, 1))
+        self.assertEqual((totals.month, str(totals)), (None, 'No records in this month yet.'))
+        self.assertEqual(str(totals.of_month(datetime(2018, 1, 1))), 'No records in this month yet.')
+        for record in ((datetime(2018, 2, 27, 8, 0), datetime(1900, 1, 1, 16, 30)),
+                       (datetime(2018, 2, 28, 8, 0), datetime(1900, 1, 1, 11, 0)),
+                       (datetime(2018, 3, 1, 7, 0), datetime(1900, 1, 1, 15, 0))):
+            preview = totals.preview(record)
+            self.assertTrue(totals.add(record))
+            Document(*record).process_file()
+            loaded = MonthTotals.from_file(datetime(2018, 1, 1))
+            for other in (preview, loaded):
+                self.assertEqual((other.month, str(other)), (totals.month, str(totals)))
+        self.assertEqual(str(totals), '03.2018: 1 days, 7:30h, 1875.00NOK (1443.75NOK after tax)')
+        self.assertIs(totals.of_month(datetime(2018, 3, 31)), totals)
+        for date in (datetime(2018, 4, 1), datetime(2018, 2, 28), datetime(2019, 3, 1)):
+            self.assertEqual(str(totals.of_month(date)), 'No records in this month yet.')
+        self.assertIsNone(totals.preview((datetime(2019, 1, 1, 8, 0), datetime(1900, 1, 1, 9, 0))))
+        self.assertFalse(totals.add((datetime(2019, 1, 1, 8, 0), datetime(1900, 1, 1, 9, 0))))
+        for record in ((datetime(2018, 3, 2, 8, 0), datetime(1900, 1, 1, 8, 0)),
+                       (datetime(2018, 3, 3, 8, 0), datetime(1900, 1, 1, 16, 0))):
+            preview = totals.preview(record)
+            self.assertTrue(totals.add(record))
+            Document(*record).process_file()
+            self.assertEqual(str(preview), str(totals))
+            self.assertEqual(str(MonthTotals.from_file(datetime(2018, 1, 1))), str(totals))
+        self.assertEqual(str(totals), '03.2018: 1 days, 7:30h, 1875.00NOK (1443.75NOK after tax)')
+
+    def test_durability(self):
+        def fsyncs():
+            return instrumentation.snapshot().get('Document.save_data', {}).get('fsyncs', 0)
+
+        group = storage.GroupCommit(3, 60 * 1000)
+        instrumentation.enable()
+        try:
+            Document(datetime(2018, 1, 1, 8, 0), datetime(1900, 1, 1, 9, 0),
+                     partial(storage.TextStorage, durability='fsync')).process_file()
+            self.assertEqual(fsyncs(), 2)
+            Document.add_records([(datetime(2018, 1, day, 8, 0), datetime(1900, 1, 1, 9, 0)) for day in (2, 3)],
+                                 partial(storage.TextStorage, durability=group))
+            self.assertEqual((fsyncs(), group.pending), (2, {'2018.txt': (2, False)}))
+            Document(datetime(2018, 1, 4, 8, 0), datetime(1900, 1, 1, 9, 0),
+                     partial(storage.TextStorage, durability=group)).process_file()
+            self.assertEqual((fsyncs(), group.pending, group.timer), (3, {}, None))
+            group.delay = 10
+            Document(datetime(2018, 1, 5, 8, 0), datetime(1900, 1, 1, 9, 0),
+                     partial(storage.TextStorage, durability=group)).process_file()
+            timer = group.timer
+            if timer:
+                timer.join()
+            self.assertEqual((fsyncs(), group.pending), (4, {}))
+        finally:
+            instrumentation.disable()
+            instrumentation.reset()
+        with open('2018.txt', 'r') as f:
+            self.assertEqual(len(f.readlines()), 5)
+        for mode in ('sync', 'fsync:1:2', 'group:1', 'group:a:b'):
+            with self.assertRaises(ValueError):
+                storage.TextStorage(2018, mode)
+        self.assertIs(storage.TextStorage(2018, 'group:3:50').durability,
+                      storage.TextStorage(2019, 'group:3:50').durability)
+        self.assertIs(storage.parse_durability('group'), storage.parse_durability('group:32:200'))
+        self.assertIsNot(storage.parse_durability('group'), storage.parse_durability('group:3:50'))
+        environment = os.environ.get('WORKTIMESAVER_DURABILITY')
+        os.environ['WORKTIMESAVER_DURABILITY'] = 'sync'
+        try:
+            with self.assertWarns(RuntimeWarning):
+                self.assertEqual(storage.TextStorage(2018).durability, 'none')
+            os.environ['WORKTIMESAVER_DURABILITY'] = 'fsync'
+            self.assertEqual(storage.TextStorage(2018).durability, 'fsync')
+        finally:
+            if environment is None:
+                del os.environ['WORKTIMESAVER_DURABILITY']
+            else:
+                os.environ['WORKTIMESAVER_DURABILITY'] = environment
+
+    def test_record_correction(self):
+        Document.add_records([(datetime(2020, month, day, 8, 0), datetime(1900, 1, 1, 8 + day % 9, 15))
+                              for month in (1, 2, 3) for day in range(1, 29, 2)])
+        with open('2020.txt', 'rb') as f:
+            content = f.read()
+        for month, day in ((1, 1), (2, 14), (2, 15), (3, 27), (3, 28), (4, 1)):
+            with open('2020.txt', 'rb') as f:
+                offset = correction.find_record(f, month, day)
+            self.assertEqual(offset, content.find(b'%02d.%02d\t' % (day + (day % 2 == 0), month))
+                             if (month, day) < (3, 28) else len(content))
+        offsets = []
+        split_blocks, find_unchanged = storage.split_blocks, storage.find_unchanged
+        storage.split_blocks = lambda f, offset: offsets.append(offset) or split_blocks(f, offset)
+        storage.find_unchanged = None
+        try:
+            salary = correction.edit_record(datetime(2020, 2, 5, 7, 0), datetime(1900, 1, 1, 20, 0))
+        finally:
+            storage.split_blocks, storage.find_unchanged = split_blocks, find_unchanged
+        self.assertEqual((salary.days_at_work, salary.worktime), (14, 3585))
+        with open('2020.txt.idx', 'r') as f:
+            checkpoint = json.load(f)
+        self.assertEqual(offsets, [checkpoint['blocks'][-1][0]])
+        remove('2020.txt.idx')
+        document = Document(datetime(2020, 1, 1))
+        document.storage.save_checkpoint(document.load_month(), document.salary)
+        with open('2020.txt.idx', 'r') as f:
+            self.assertEqual(json.load(f), checkpoint)
+        expected = BytesIO()
+        copy_rebuilt(BytesIO(content.replace(b'05.02\t\t08:00-13:15\t05:15h', b'05.02\t\t07:00-20:00\t13:00h')),
+                     expected, 2020)
+        with open('2020.txt', 'rb') as f:
+            self.assertEqual(f.read(), expected.getvalue())
+        self.assertEqual(correction.delete_record(datetime(2020, 3, 27)).days_at_work, 13)
+        with self.assertRaises(ValueError):
+            correction.delete_record(datetime(2020, 3, 27))
+        self.assertEqual(Document(datetime(2020, 1, 1)).storage.load_checkpoint()['days'], 13)
+        with open('2020.txt', 'rb') as f:
+            content = f.read()
+        storage.replace_tail('2020.txt', 10, b'broken')
+        with open('2020.txt.journal', 'wb') as f:
+            f.write(b'10 %d\n' % (len(content) - 10) + content[10:])
+        with storage.TextStorage(2020).lock(), open('2020.txt', 'rb') as f:
+            self.assertEqual(f.read(), content)
+        self.assertFalse(os.path.exists('2020.txt.journal'))
+        output = StringIO()
+        with redirect_stdout(output):
+            self.assertEqual(cli.main(['edit', '03.01.20', '8:00', '9:00']), 0)
+            self.assertEqual(cli.main(['delete', '05.01.20']), 0)
+        self.assertEqual(output.getvalue().splitlines()[-1],
+                         'Record deleted. In month 01 you have earned 11250.00NOK before tax.')
+
+    def test_month_cache(self):
+        cache = MonthCache()
+        for day in (1, 2):
+            document = Document(datetime(2020, 3, day, 8, 0), datetime(1900, 1, 1, 16, 0))
+            self.assertEqual(cache.load(document), None if day == 1 else 3)
+            document.append_record(None if day == 1 else 3)
+            cache.store(document)
+            document.load_month = None
+        os.remove('2020.txt.idx')
+        document = Document(datetime(2020, 4, 1, 8, 0), datetime(1900, 1, 1, 16, 0))
+        document.load_month = None
+        self.assertEqual((cache.load(document), document.salary.worktime, document.salary.period), (3, 900, (2020, 3)))
+        with open('2020.txt', 'a') as f:
+            f.write('03.03\t\t08:00-09:00\t01:00h\n')
+        document = Document(datetime(2020, 4, 1, 8, 0), datetime(1900, 1, 1, 16, 0))
+        self.assertEqual((cache.load(document), document.salary.worktime), (3, 960))
+        document.append_record(3)
+        cache.store(document)
+        offsets = []
+        split_blocks = storage.split_blocks
+        storage.split_blocks = lambda f, offset: offsets.append(offset) or split_blocks(f, offset)
+        try:
+            for day in (2, 3):
+                document = Document(datetime(2020, 4, day, 8, 0), datetime(1900, 1, 1, 16, 0))
+                document.load_month = None
+                document.append_record(cache.load(document))
+                cache.store(document)
+        finally:
+            storage.split_blocks = split_blocks
+        self.assertEqual(offsets, [document.storage.blocks[-1][0]] * 2)
+        self.assertNotEqual(offsets[0], 0)
+
+    def test_mirror(self):
+        def submit(day):
+            Document(datetime(2020, 1, day, 8, 0), datetime(1900, 1, 1, 16, 0), storage).process_file()
+
+        def read(path):
+            with open(path, 'rb') as f:
+                return f.read()
+
+        os.mkdir('remote')
+        remote = mirror.SlowDirectory('remote', 0.001)
+        flusher = mirror.Flusher(60 * 1000)
+        storage = partial(mirror.MirrorStorage, remote=remote, cache_directory='cache', flusher=flusher)
+        Document.add_records([(datetime(2020, 1, day, 8, 0), datetime(1900, 1, 1, 16, 0)) for day in (1, 2)], storage)
+        local = storage(2020).document
+        self.assertFalse(os.path.exists('remote/2020.txt'))
+        self.assertEqual(flusher.flush(), [])
+        self.assertEqual(read('remote/2020.txt'), read(local))
+        remote.operations.clear()
+        submit(3)
+        self.assertEqual(remote.operations, {'get_signature': 1})
+        flusher.flush()
+        with open('remote/2020.txt', 'a') as f:
+            f.write('04.01\t\t08:00-09:00\t01:00h\n')
+        submit(5)
+        self.assertEqual(remote.operations['read'], 1)
+        flusher.flush()
+        self.assertEqual(len(read('remote/2020.txt').splitlines()), 5)
+        submit(6)
+        with open('remote/2020.txt', 'a') as f:
+            f.write('07.01\t\t08:00-09:00\t01:00h\n')
+        errors = flusher.flush()
+        self.assertEqual([type(error) for error in errors], [mirror.ConflictError])
+        self.assertEqual(read('remote/2020.txt.conflict'), b'06.01\t\t08:00-16:00\t08:00h\n')
+        self.assertEqual(read(local), read('remote/2020.txt'))
+        submit(8)
+        os.remove(local + '.remote')
+        self.assertEqual(flusher.flush(), [])
+        self.assertTrue(read('remote/2020.txt').endswith(b'08.01\t\t08:00-16:00\t08:00h\n'))
+        self.assertEqual(read(local), read('remote/2020.txt'))
+        save_data = mirror.TextStorage.save_data
+        mirror.TextStorage.save_data = lambda *_: 1 / 0
+        try:
+            with self.assertRaises(ZeroDivisionError):
+                submit(9)
+        finally:
+            mirror.TextStorage.save_data = save_data
+        storage(2020).flush()
+        self.assertTrue(read('remote/2020.txt').endswith(b'09.01\t\t08:00-16:00\t08:00h\n'))
+        self.assertEqual(read(local), read('remote/2020.txt'))
+
+    def test_async_document(self):
+        async def submit():
+            executor = ThreadPoolExecutor(2)
+            documents = [aio.AsyncDocument(*dates, storage=partial(storage.TextStorage, directory=employee),
+                                           executor=executor) for dates in records for employee in ('a', 'b')]
+            salaries = await asyncio.gather(*(document.process_file() for document in documents))
+            document = aio.AsyncDocument(datetime(2020, 1, 1), storage=partial(storage.TextStorage, directory='a'))
+            return salaries, await document.load_month(), document.document.salary.days_at_work
+
+        records = [(datetime(2020, month, day, 8, 0), datetime(1900, 1, 1, 16, 30)) for month in (1, 2)
+                   for day in range(1, 11)]
+        for employee in ('a', 'b', 'expected'):
+            os.mkdir(employee)
+        salaries, month, days = asyncio.run(submit())
+        self.assertEqual((salaries[-1], month, days), ('20000.00NOK', 2, 10))
+        Document.add_records(records, partial(storage.TextStorage, directory='expected'))
+        with open('expected/2020.txt', 'rb') as f:
+            expected = f.read()
+        for employee in ('a', 'b'):
+            with open(f'{employee}/2020.txt', 'rb') as f:
+                self.assertEqual(f.read(), expected)
+        asyncio.run(aio.AsyncDocument.add_records(records[:5] + [(datetime(2021, 1, 4, 8, 0), records[0][1])]))
+        self.assertTrue(os.path.exists('2020.txt') and os.path.exists('2021.txt'))
+
+    def test_dates_parsing(self):
+        for start, end in (('26.02.20 8:00', '16:30'), ('1.1.69 00:00', '23:59'), ('31.12.68 23:5', '0:0')):
+            expected = datetime.strptime(start, '%d.%m.%y %H:%M'), datetime.strptime(end, '%H:%M')
+            self.assertEqual(parse_dates(start, end), expected)
+        for start, end in (('26.02.20  8:00', '16:30'), (' 26.02.20\t8:00 ', ' 16:30\n')):
+            self.assertEqual(parse_dates(start, end), (datetime(2020, 2, 26, 8, 0), datetime(1900, 1, 1, 16, 30)))
+        for start, end in (('26.02.20', '16:30'), ('26.02.2020 8:00', '16:30'), ('30.02.20 8:00', '16:30'),
+                           ('26.02.20 8:00', '24:00'), ('26.02.20 8:00', '-1:00'), ('26.02.20 8:00', '')):
+            with self.assertRaises(ValueError):
+                parse_dates(start, end)
+
+    def test_backward_reading(self):
+        contents = (b'', b'\n', b'one', b'one\n', b'one\ntwo', b'one\r\ntwo\r\n\nthree\n', b'a' * 50 + b'\n\nb\n')
+        for content in contents:
+            expected = list(reversed(content.decode().replace('\r\n', '\n').splitlines(keepends=True)))
+            for block_size in (1, 2, 3, 8192):
+                self.assertEqual(list(read_backwards(BytesIO(content), block_size)), expected)
+
+
+class TestSQLiteStorage(unittest.TestCase):
+
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.directory = tempfile.TemporaryDirectory()
+        os.chdir(self.directory.name)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.directory.cleanup()
+
+    def test_export(self):
+        dates = [(datetime(2017, month, day, 8, 0), datetime(1900, 1, 1, 8 + day % 9, 15)) for month in (1, 2, 3)
+                 for day in range(1, 29, 3)]
+        expected_salaries = [Document(*record).process_file() for record in dates]
+        with open('2017.txt', 'r') as f:
+            expected = f.read()
+        storage = partial(SQLiteStorage, database='test.db')
+        Document.add_records(dates[:5], storage)
+        salaries, cache = [], MonthCache()
+        for record in dates[5:]:
+            document = Document(*record, storage=storage)
+            with document.storage.lock():
+                salaries.append(document.append_record(cache.load(document)))
+                cache.store(document)
+        self.assertEqual(cache.states, {})
+        output = StringIO()
+        storage(2017).export(output)
+        month = storage(2017).get_month(2)
+        records = storage(2017).get_records((1, 28), (2, 4))
+        self.assertEqual(output.getvalue(), expected)
+        self.assertEqual(salaries, expected_salaries[5:])
+        self.assertEqual((month.worktime, month.days_at_work), (2190, 10))
+        self.assertEqual(records, ['28.01\t\t08:00-09:15\t01:15h', '01.02\t\t08:00-09:15\t01:15h',
+                                   '04.02\t\t08:00-12:15\t04:15h'])
+
+
+class TestLocking(unittest.TestCase):
+
+    @unittest.skipUnless(storage.fcntl, 'advisory locks require fcntl')
+    def test_concurrent_submits(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with Pool(4) as pool:
+                pool.map(stress_append.submit, [(directory, worker, 40) for worker in range(4)])
+            expected = {stress_append.record_dates(worker, index) for worker in range(4) for index in range(40)}
+            self.assertEqual(stress_append.verify(directory, expected), [])
+
+    @unittest.skipUnless(storage.fcntl, 'advisory locks require fcntl')
+    def test_removed_lock(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'year.lock')
+            waiting, entered = threading.Event(), []
+
+            def wait():
+                waiting.set()
+                with storage.locked(path):
+                    entered.append(os.path.exists(path))
+
+            with storage.locked(path):
+                thread = threading.Thread(target=wait)
+                thread.start()
+                waiting.wait()
+                thread.join(0.2)
+                os.remove(path)
+            thread.join()
+        self.assertEqual(entered, [True])
+
+
+class TestCli(unittest.TestCase):
+
+    def test_commands(self):
+        cwd = os.getcwd()
+        output = StringIO()
+        with tempfile.TemporaryDirectory() as directory, redirect_stdout(output):
+            os.chdir(directory)
+            try:
+                cli.main(['add', '26.02.20', '8:00', '16:30'])
+                cli.main(['add', '27.02.20', '8:00', '12:00'])
+                with open('2020.txt', 'rb') as f:
+                    content = f.read()
+                storage.replace_tail('2020.txt', 10, b'broken\n')
+                with open('2020.txt.journal', 'wb') as f:
+                    f.write(b'10 %d\n' % (len(content) - 10) + content[10:])
+                self.assertEqual(cli.main(['summary', '--year', '2020']), 0)
+                self.assertEqual(cli.main(['summary', '--year', '2019']), 1)
+            finally:
+                os.chdir(cwd)
+        self.assertEqual(output.getvalue().splitlines()[1:4], [
+            'Record added. In current month you have earned 3000.00NOK before tax.', 'Month 02:', '2\t\t\t\t12:00h'])
+
+    def test_no_tkinter(self):
+        code = 'import sys, WorkTimeSaver.__main__, WorkTimeSaver.cli; print("tkinter" in sys.modules)'
+        result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True)
+        self.assertEqual(result.stdout, 'False\n')
+
+
+class TestParser(unittest.TestCase):
+
+    def test_record(self):
+        entry = parse_line(b'15.02\t\t08:00-18:25\t10:25h\n')
+        self.assertEqual((entry.kind, entry.day, entry.month, entry.start, entry.end, entry.minutes),
+                         ('record', 15, 2, 480, 1105, 625))
+        self.assertEqual(parse_line(memoryview(b'31.08\t\t08:00-00:00\t16:00h')).minutes, 960)
+
+    def test_irregular_lines(self):
+        data = (
+            ('15.02\t\t8:00-16:00\t08:00h  sick leave\n', 'record', 2, 480),
+            ('26\t\t\t\t288:00h\n', 'summary', 6, None),
+            ('20\t\t\t\t62:30h\n', 'summary', 0, 3750),
+            ('\t\t\t\t87687.50NOK (35951.88PLN)\n', 'text', 0, None),
+            ('After tax:\t\t\t61871.88NOK (25367.47PLN)\n', 'text', 0, None),
+            ('---------\n', 'separator', 0, None),
+            ('\n', 'blank', 0, None),
+            ('', 'blank', 0, None),
+            ('note\tab:cdh\n', 'text', 0, None),
+        )
+        for line, kind, month, minutes in data:
+            entry = parse_line(line)
+            self.assertEqual((entry.kind, entry.month, entry.minutes), (kind, month, minutes))
+
+    def test_buffer(self):
+        kinds = [entry.kind for entry in parse_buffer(bytearray(b'01.03\t\t08:00-16:00\t08:00h\n\n-----\n'))]
+        self.assertEqual(kinds, ['record', 'blank', 'separator'])
+
+
+class TestDaemon(unittest.TestCase):
+
+    @unittest.skipUnless(hasattr(socket, 'AF_UNIX'), 'daemon requires Unix domain sockets')
+    def test_requests(self):
+        cwd = os.getcwd()
+        output = StringIO()
+        with tempfile.TemporaryDirectory() as directory:
+            os.chdir(directory)
+            server = daemon.Daemon()
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            try:
+                with redirect_stdout(output):
+                    cli.main(['add', '26.02.20', '8:00', '16:30'])
+                    cli.main(['add', '27.02.20', '8:00', '12:00'])
+                self.assertEqual((server.cache.states[2020][1], server.cache.states[2020][2].worktime), (2, 720))
+                with open('2020.txt', 'a') as f:
+                    f.write('28.02\t\t08:00-10:00\t02:00h\n')
+                summary = daemon.request('SUMMARY 2020')
+                self.assertEqual(daemon.request('ADD 01.03.20 8:00 9:00'), '250.00NOK')
+                with open('2020.txt.idx', 'r') as f:
+                    self.assertEqual(server.cache.states[2020][3], json.load(f)['blocks'])
+                with self.assertRaises(daemon.DaemonError):
+                    daemon.request('ADD 30.02.20 8:00 9:00')
+                with self.assertRaises(OSError):
+                    daemon.Daemon()
+            finally:
+                server.shutdown()
+                server.server_close()
+                os.chdir(cwd)
+            with open(os.path.join(directory, '2020.txt'), 'r') as f:
+                lines = f.readlines()
+            self.assertFalse(os.path.exists(os.path.join(directory, daemon.SOCKET_FILE)))
+        self.assertEqual(output.getvalue().splitlines()[1],
+                         'Record added. In current month you have earned 3000.00NOK before tax.')
+        self.assertEqual(summary, {'month': 2, 'summary': '3\t\t\t\t14:00h\n\t\t\t\t3500.00NOK (1435.00PLN)\n'
+                                                           'After tax:\t\t\t2695.00NOK (1104.95PLN)\n'})
+        self.assertEqual(lines[3], '3\t\t\t\t14:00h\n')
+
+
+class TestPayroll(unittest.TestCase):
+
+    def test_directory_run(self):
+        with tempfile.TemporaryDirectory() as directory:
+            os.mkdir(os.path.join(directory, 'employee'))
+            path = os.path.join(directory, 'employee', '2019.txt')
+            with open(path, 'w') as f:
+                f.write('30.08\t\t08:00-16:30\t08:30h\n31.08\t\t08:00-00:00\t16:00h\n'
+                        '2\t\t\t\t23:30h\n\t\t\t\t5875.00NOK (2408.75PLN)\nAfter tax:\t\t\t4523.75NOK (1854.74PLN)\n\n'
+                        '------------------------------------------------------------------------------------\n\n'
+                        '01.09\t\t08:00-18:25\t10:25h\n')
+            with open(os.path.join(directory, 'notes.txt'), 'w') as f:
+                f.write('01.09\t\t08:00-18:25\t10:25h\n')
+            self.assertEqual(list(payroll.find_files(directory)), [path])
+            output = StringIO()
+            failures = payroll.run([path, os.path.join(directory, '2020.txt')], output, 'json', workers=2)
+        rows = [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertEqual(failures, 1)
+        self.assertEqual([(row['month'], row['days'], row['minutes'], row['gross']) for row in rows[:2]],
+                         [(8, 2, 1410, 5875), (9, 1, 595, 2479.17)])
+        self.assertTrue(rows[2]['error'].startswith('FileNotFoundError'))
+
+
+class TestExport(unittest.TestCase):
+
+    def test_rows(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, '2019.txt')
+            with open(path, 'w') as f:
+                f.write('30.08\t\t08:00-16:30\t08:30h\n31.08\t\t08:00-00:00\t16:00h\n'
+                        '2\t\t\t\t23:30h\n\t\t\t\t5875.00NOK (2408.75PLN)\nAfter tax:\t\t\t4523.75NOK (1854.74PLN)\n\n'
+                        '------------------------------------------------------------------------------------\n\n'
+                        'vacation\n01.09\t\t08:00-18:25\t10:25h\n')
+            output = StringIO()
+            self.assertEqual(export.export([directory], output, summaries=True, buffer_size=10), 5)
+            lines = StringIO()
+            export.export([path], lines, 'json')
+        self.assertEqual(output.getvalue().splitlines()[1:], [
+            f'{path},2019,record,8,30,08:00,16:30,510,,,', f'{path},2019,record,8,31,08:00,00:00,960,,,',
+            f'{path},2019,summary,8,,,,1410,2,5875.0,4523.75', f'{path},2019,record,9,1,08:00,18:25,625,,,',
+            f'{path},2019,summary,9,,,,595,1,2479.17,1908.96'])
+        self.assertEqual(json.loads(lines.getvalue().splitlines()[2])['end'], '18:25')
+
+
+class TestArchive(unittest.TestCase):
+
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.directory = tempfile.TemporaryDirectory()
+        os.chdir(self.directory.name)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.directory.cleanup()
+
+    def test_archive(self):
+        generator.generate('2019.txt', months=3, days=4, noise=0.2)
+        with open('2019.txt', 'rb') as f:
+            content = f.read()
+        salaries = {month: str(salary) for month, salary in payroll.month_salaries(BytesIO(content)).items()}
+        rows = StringIO()
+        export.export(['.'], rows, summaries=True)
+        index = archive.archive('2019.txt')
+        with gzip.open('2019.txt.gz', 'rb') as f:
+            self.assertEqual(f.read(), content)
+        self.assertEqual(sorted(index['months']), ['1', '2', '3'])
+        with archive.open_year('2019.txt', [2]) as f:
+            self.assertEqual({month: str(salary) for month, salary in payroll.month_salaries(f).items()},
+                             {2: salaries[2]})
+        self.assertEqual(archive.archive_closed(['.'], 2019), [])
+        self.assertEqual(archive.archive_closed(['.'], 2020, remove=True), ['./2019.txt'])
+        self.assertEqual(sorted(os.listdir('.')), ['2019.txt.gz', '2019.txt.gz.idx'])
+        archived = StringIO()
+        export.export(['.'], archived, summaries=True)
+        self.assertEqual(archived.getvalue(), rows.getvalue())
+        self.assertEqual(len(query.query((2019, 1), (2019, 12), '.')), 3)
+        Document(datetime(2019, 3, 27, 8, 0), datetime(1900, 1, 1, 9, 0)).process_file()
+        with archive.open_year('2019.txt') as f:
+            self.assertEqual(f.read(), content + b'27.03\t\t08:00-09:00\t01:00h\n')
+        self.assertEqual(archive.archive_closed(['.'], 2020), ['./2019.txt'])
+        self.assertFalse(os.path.exists('2019.txt'))
+        output = StringIO()
+        with redirect_stdout(output):
+            self.assertEqual(cli.main(['summary', '--year', '2019', '--month', '3']), 0)
+            self.assertEqual(cli.main(['summary', '--year', '2019', '--month', '4']), 1)
+        expected = payroll.month_salaries(BytesIO(content))[3]
+        expected.update_work(60)
+        self.assertEqual(output.getvalue().splitlines()[1], expected.sum_up().split('\n')[0])
+        self.assertEqual(output.getvalue().splitlines()[-1], 'There are no records of month 04 in 2019.txt.')
+
+
+class TestRepair(unittest.TestCase):
+
+    def test_rebuild(self):
+        summary = '2\t\t\t\t23:30h\n\t\t\t\t5875.00NOK (2408.75PLN)\nAfter tax:\t\t\t4523.75NOK (1854.74PLN)\n'
+        content = '30.08\t\t08:00-16:30\t08:30h\n31.08\t\t08:00-00:00\t16:00h\n{}\n' \
+                  '------------------------------------------------------------------------------------\n\n' \
+                  '01.09\t\t08:00-18:25\t10:25h\n02.09\t\t08:00-16:00\t08:00h\n{}\n'
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, '2019.txt')
+            with open(path, 'w') as f:
+                f.write(content.format(summary.replace('23:30', '23:31'), '2\t\t\t\t0:00h\n'))
+            self.assertTrue(rebuild_summaries(path))
+            with open(path, 'r') as f:
+                self.assertEqual(f.read(), content.format(summary, '2\t\t\t\t17:25h\n'))
+            self.assertFalse(rebuild_summaries(path))
+            self.assertEqual(sorted(os.listdir(directory)), ['2019.txt', '2019.txt.lock'])
+
+    def test_note_between_records(self):
+        cwd = os.getcwd()
+        with tempfile.TemporaryDirectory() as directory:
+            os.chdir(directory)
+            try:
+                for day in (1, 2, 3):
+                    Document(datetime(2019, 8, day, 8, 0), datetime(1900, 1, 1, 16, 0)).process_file()
+                    if day == 2:
+                        with open('2019.txt', 'r') as f:
+                            content = f.read().replace('02.08', 'sick leave\n02.08')
+                        with open('2019.txt', 'w') as f:
+                            f.write(content)
+                        edited = stat('2019.txt')
+                        utime('2019.txt', ns=(edited.st_atime_ns, edited.st_mtime_ns + 10 ** 9))
+                Document(datetime(2019, 9, 1, 8, 0), datetime(1900, 1, 1, 10, 0)).process_file()
+                with open('2019.txt', 'r') as f:
+                    self.assertEqual(f.readlines()[4], '2\t\t\t\t15:00h\n')
+                self.assertFalse(rebuild_summaries('2019.txt'))
+                with open('2019.txt', 'rb') as f:
+                    salaries = payroll.month_salaries(f)
+                rows = list(export.file_rows('2019.txt', summaries=True))
+            finally:
+                os.chdir(cwd)
+        self.assertEqual([(month, salary.days_at_work, salary.worktime) for month, salary in salaries.items()],
+                         [(8, 2, 900), (9, 1, 120)])
+        self.assertEqual([(row['month'], row['days']) for row in rows if row['kind'] == 'summary'], [(8, 2), (9, 1)])
+
+
+class TestInstrumentation(unittest.TestCase):
+
+    def test_counters(self):
+        sum_month = Document.sum_month
+        cwd = os.getcwd()
+        with tempfile.TemporaryDirectory() as directory:
+            os.chdir(directory)
+            try:
+                instrumentation.enable()
+                for day in (1, 2):
+                    Document(datetime(2020, 3, day, 8, 0), datetime(1900, 1, 1, 16, 0)).process_file()
+                os.remove('2020.txt.idx')
+                Document(datetime(2020, 4, 1, 8, 0), datetime(1900, 1, 1, 16, 0)).process_file()
+                instrumentation.dump(os.path.join(directory, 'stats.json'))
+                with open('stats.json', 'r') as f:
+                    stats = json.load(f)['stats']
+            finally:
+                instrumentation.disable()
+                instrumentation.reset()
+                os.chdir(cwd)
+        self.assertIs(Document.sum_month, sum_month)
+        self.assertFalse(instrumentation.is_enabled())
+        self.assertEqual(stats['Document.process_file']['calls'], 3)
+        self.assertEqual(stats['Document.get_lines']['lines'], 2)
+        self.assertEqual((stats['Document.sum_month']['lines'], stats['Document.sum_month']['records']), (5, 5))
+        self.assertEqual((stats['Document.save_data']['items'], stats['Document.save_data']['bytes']), (4, 242))
+        self.assertEqual(stats['Salary.sum_up']['calls'], 1)
+
+
+class TestQuery(unittest.TestCase):
+
+    def test_range(self):
+        with tempfile.TemporaryDirectory() as directory:
+            for year, months in ((2019, 12), (2021, 2)):
+                generator.generate(os.path.join(directory, f'{year}.txt'), months=months, days=3)
+            rows = query.query((2019, 11), (2021, 1), directory)
+            index = query.MonthIndex(os.path.join(directory, query.INDEX_FILE))
+            self.assertEqual(query.query((2019, 11), (2021, 1), directory, index), rows)
+            self.assertFalse(index.changed)
+            with open(os.path.join(directory, '2021.txt'), 'a') as f:
+                f.write('05.02\t\t08:00-09:00\t01:00h\n')
+            self.assertEqual(query.query((2021, 2), (2021, 2), directory, index)[0]['days'], 4)
+            self.assertTrue(index.changed)
+            output = StringIO()
+            with redirect_stdout(output):
+                self.assertEqual(cli.main(['query', '2019-12', '--directory', directory]), 0)
+                self.assertEqual(cli.main(['query', '2020-01', '2020-12', '--directory', directory]), 1)
+        self.assertEqual([(row['year'], row['month'], row['days']) for row in rows], [(2019, 11, 3), (2019, 12, 3),
+                                                                                       (2021, 1, 3)])
+        self.assertEqual(query.total(rows)['minutes'], sum(row['minutes'] for row in rows))
+        self.assertEqual(output.getvalue().splitlines()[0][:21], '12.2019        3 days')
+
+
+class TestRates(unittest.TestCase):
+
+    def test_historical_rates(self):
+        cwd = os.getcwd()
+        with tempfile.TemporaryDirectory() as directory:
+            os.chdir(directory)
+            try:
+                with open('rates.csv', 'w') as f:
+                    f.write('date,currency,rate\n2019-09-30,PLN,0.5\n2019-07-31,PLN,0.4\n2019-07-15,EUR,0.1\n')
+                table = rates.get_table()
+                self.assertIs(rates.get_table(), table)
+                self.assertEqual([table.get_rate('PLN', 2019, month) for month in (6, 7, 8, 9, 10)],
+                                 [None, 0.4, 0.4, 0.5, 0.5])
+                self.assertEqual(rates.get_rate('PLN', (2019, 6)), 0.41)
+                self.assertEqual(rates.get_rate('EUR'), None)
+                salary = Salary()
+                salary.worktime, salary.period, salary.exchange_currencies = 600, (2019, 8), ['PLN', 'EUR', 'USD']
+                self.assertEqual(salary.exchange_currency(1000), '400.00PLN, 100.00EUR')
+                salary.exchange_currencies = ['USD']
+                self.assertEqual(salary.sum_up(), '0\t\t\t\t10:00h\n\t\t\t\t2500.00NOK\nAfter tax:\t\t\t1925.00NOK\n')
+                for day in (30, 31):
+                    Document(datetime(2019, 8, day, 8, 0), datetime(1900, 1, 1, 18, 0)).process_file()
+                Document(datetime(2019, 9, 1, 8, 0), datetime(1900, 1, 1, 18, 0)).process_file()
+                with open('2019.txt', 'r') as f:
+                    summary = f.readlines()[3]
+                self.assertFalse(rebuild_summaries('2019.txt'))
+                os.mkdir('employee')
+                os.rename('rates.csv', 'employee/rates.csv')
+                employee = partial(storage.TextStorage, directory='employee')
+                for day in (31, 1):
+                    Document(datetime(2019, 8 + (day == 1), day, 8, 0), datetime(1900, 1, 1, 18, 0),
+                             employee).process_file()
+                with open('employee/2019.txt', 'r') as f:
+                    employee_summary = f.readlines()[2]
+                self.assertFalse(rebuild_summaries('employee/2019.txt'))
+            finally:
+                os.chdir(cwd)
+        self.assertEqual(summary, '\t\t\t\t4750.00NOK (1900.00PLN)\n')
+        self.assertEqual(employee_summary, '\t\t\t\t2375.00NOK (950.00PLN)\n')
+
+
+class TestSimulation(unittest.TestCase):
+
+    @unittest.skipUnless(simulation, 'simulation requires numpy')
+    def test_grid_matches_salary(self):
+        worktimes = [0, 59, 9749, 9750, 9751, 12345, 20000]
+        parameters = {'rate': [250, 199.5], 'overtime': [162.5, 170.25], 'bonus': [1.5, 2], 'standard_tax': [0.23],
+                      'overtime_tax': [0.35, 0.4]}
+        gross, net = simulation.simulate(worktimes, **parameters)
+        self.assertEqual(gross.shape, (7, 2, 2, 2, 1, 2))
+        for index in simulation.np.ndindex(gross.shape):
+            salary = Salary()
+            salary.worktime = worktimes[index[0]]
+            for name, position in zip(simulation.PARAMETERS, index[1:]):
+                setattr(salary, name, parameters[name][position])
+            money = salary.calculate_salary()
+            self.assertEqual((gross[index], net[index]), (sum(money), salary.deduct_tax(money)))
+        with self.assertRaises(TypeError):
+            simulation.simulate(worktimes, tax=0.2)
+
+
+class TestBenchmarks(unittest.TestCase):
+
+    def test_generated_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, '2000.txt')
+            generator.generate(path, months=14, days=5)
+            with open(path, 'rb') as f:
+                salaries = payroll.month_salaries(f)
+            self.assertFalse(rebuild_summaries(path))
+        self.assertEqual([(month, salary.days_at_work) for month, salary in salaries.items()][:3],
+                         [(1, 10), (2, 10), (3, 5)])
+
+    def test_report(self):
+        report = run.run(sizes=(2,), days=3, repeat=1)
+        self.assertEqual([result['name'] for result in report['results']], [
+            'process_file (no checkpoint)', 'process_file (checkpoint)', 'sum_month', 'get_minutes', 'get_month',
+            'Salary.sum_up'])
+        self.assertEqual(report['results'][2]['operations'], 3)
+        self.assertTrue(all(result['peak_memory'] > 0 for result in report['results']))
+        self.assertEqual(run.compare(report['results'], report['results'])['sum_month', 2], 1)
+
 
 if __name__ == '__main__':
     unittest.main()